@@ -1,20 +1,71 @@
-from typing import Annotated
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Annotated, AsyncIterator, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.config import settings
+from app.core.database import AsyncSessionLocal, get_db, use_primary
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.core.responses import RawJSONResponse, conditional_json
+from app.core.tracing import trace_buffer
 from app.dependencies import get_current_superuser
 from app.models.user import User
-from app.schemas.user import AdminUserCreate, AdminUserUpdate, UserResponse
-from app.services.user_service import UserService
+from app.schemas.user import (
+    USER_RECORD_FIELDS,
+    AdminUserCreate,
+    AdminUserUpdate,
+    BulkUserAction,
+    BulkUserActionResult,
+    BulkUserImportResult,
+    BulkUserResult,
+    UserResponse,
+    UserStatsResponse,
+    dump_user_json,
+    dump_users_json,
+    user_etag,
+    user_record_adapter,
+    user_records_adapter,
+)
+from app.services.stats_service import user_stats
+from app.services.user_service import (
+    CONFLICT_DETAILS,
+    SEARCH_SORT_COLUMNS,
+    USER_PUBLIC_COLUMNS,
+    UserConflictError,
+    UserService,
+)
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Actions en masse qui ne s'appliquent jamais à l'administrateur appelant
+SELF_PROTECTED_ACTIONS = {"delete", "deactivate", "revoke_superuser"}
+
+
+def _parse_user_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, user_id = decode_cursor(cursor, 2)
+        return datetime.fromisoformat(created_at), str(user_id)
+    except (InvalidCursor, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
 
 @router.get("/users", response_model=list[UserResponse])
 async def get_all_users(
-    skip: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(100, ge=1, le=1000),
     current_admin: Annotated[User, Depends(get_current_superuser)] = None,
     db: Annotated[AsyncSession, Depends(get_db)] = None
@@ -22,11 +73,24 @@ async def get_all_users(
     """
     Récupérer tous les utilisateurs (admin seulement)
     
-    - **skip**: Nombre d'utilisateurs à ignorer (pagination)
+    - **cursor**: Curseur de la page suivante (en-tête `X-Next-Cursor` de la réponse précédente)
+    - **skip**: Obsolète, nombre d'utilisateurs à ignorer (ignoré si `cursor` est fourni)
     - **limit**: Nombre maximum d'utilisateurs à retourner
     """
-    users = await UserService.get_all(db, skip=skip, limit=limit)
-    return users
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    if cursor is not None:
+        users = await UserService.get_page(db, limit=limit + 1, after=_parse_user_cursor(cursor))
+    elif skip:
+        users = await UserService.get_all(db, skip=skip, limit=limit + 1)
+    else:
+        users = await UserService.get_page(db, limit=limit + 1)
+
+    response = RawJSONResponse(dump_users_json(users[:limit]))
+    if len(users) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            users[limit - 1].created_at, users[limit - 1].id
+        )
+    return response
 
 
 @router.get("/users/count")
@@ -39,20 +103,161 @@ async def count_users(
     return {"total": count}
 
 
+@router.get("/users/search", response_model=list[UserResponse])
+async def search_users(
+    email: str | None = Query(None, min_length=1, max_length=255),
+    username: str | None = Query(None, min_length=1, max_length=50),
+    q: str | None = Query(None, min_length=2, max_length=100),
+    is_active: bool | None = Query(None),
+    is_superuser: bool | None = Query(None),
+    cursor: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: Annotated[User, Depends(get_current_superuser)] = None,
+    db: Annotated[AsyncSession, Depends(get_db)] = None
+):
+    """
+    Rechercher des utilisateurs (admin seulement)
+
+    - **email**: Début de l'email
+    - **username**: Début du nom d'utilisateur
+    - **q**: Mots du nom complet
+    - **is_active** / **is_superuser**: Filtres de statut
+    - **cursor**: Curseur de la page suivante (en-tête `X-Next-Cursor`)
+    - **limit**: Nombre maximum d'utilisateurs à retourner
+
+    Les résultats sont triés par email si `email` est fourni, sinon par nom
+    d'utilisateur si `username` est fourni, sinon par id.
+    """
+    sort = "email" if email else "username" if username else "id"
+    after = None
+    if cursor is not None:
+        try:
+            cursor_sort, after = decode_cursor(cursor, 2)
+        except InvalidCursor:
+            cursor_sort = None
+        if cursor_sort != sort or not isinstance(after, str):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Curseur de pagination invalide"
+            )
+
+    users = await UserService.search(
+        db,
+        email=email,
+        username=username,
+        full_name=q,
+        is_active=is_active,
+        is_superuser=is_superuser,
+        sort=sort,
+        limit=limit + 1,
+        after=after,
+    )
+    response = RawJSONResponse(dump_users_json(users[:limit]))
+    if len(users) > limit:
+        last_value = getattr(users[limit - 1], SEARCH_SORT_COLUMNS[sort].key)
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(sort, last_value)
+    return response
+
+
+@router.get("/users/stats", response_model=UserStatsResponse)
+async def get_user_stats(
+    current_admin: Annotated[User, Depends(get_current_superuser)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Statistiques des utilisateurs (admin seulement)
+
+    Lues depuis les compteurs maintenus en mémoire : aucune requête SQL, sauf
+    au premier appel ou après une suppression en masse.
+    """
+    await user_stats.ensure_fresh(db)
+    return UserStatsResponse(
+        total=user_stats.total,
+        active=user_stats.active,
+        superusers=user_stats.superusers,
+        signups_per_day=user_stats.signups_per_day(),
+        reconciled_at=user_stats.reconciled_at,
+    )
+
+
+@router.get("/users/export")
+async def export_users(
+    current_admin: Annotated[User, Depends(get_current_superuser)],
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+):
+    """
+    Exporter tous les utilisateurs (admin seulement)
+
+    La réponse est produite au fil de l'eau à partir d'un curseur côté serveur :
+    la mémoire utilisée ne dépend pas de la taille de la table.
+    """
+    return StreamingResponse(
+        _export_chunks(export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
+
+
+async def _export_chunks(export_format: str) -> AsyncIterator[bytes]:
+    # Session propre au flux : celle de get_db ne couvre pas l'envoi de la réponse.
+    # Les valeurs passent par le sérialiseur de `UserResponse` : mêmes dates,
+    # mêmes booléens (true/false) que l'API, en NDJSON comme en CSV.
+    async with AsyncSessionLocal() as db:
+        columns = [column.key for column in USER_PUBLIC_COLUMNS]
+        if export_format == "csv":
+            yield _csv_lines([columns])
+
+        async for rows in UserService.stream_public(db):
+            records = [{field: getattr(row, field) for field in USER_RECORD_FIELDS} for row in rows]
+            if export_format == "csv":
+                yield _csv_lines([
+                    [_csv_value(record[column]) for column in columns]
+                    for record in user_records_adapter.dump_python(records, mode="json")
+                ])
+            else:
+                yield b"".join(user_record_adapter.dump_json(record) + b"\n" for record in records)
+
+
+# Premiers caractères qu'un tableur interprète comme le début d'une formule
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    # Nom ou nom d'utilisateur saisi par l'utilisateur : une cellule "=HYPERLINK(…)"
+    # deviendrait une formule active à l'ouverture du fichier
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_lines(rows: list[list]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: str,
+    request: Request,
     current_admin: Annotated[User, Depends(get_current_superuser)],
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    """Récupérer un utilisateur par ID (admin seulement)"""
-    user = await UserService.get_by_id(db, user_id)
+    """
+    Récupérer un utilisateur par ID (admin seulement)
+
+    Lu via le cache des utilisateurs authentifiés (invalidé à chaque écriture
+    de ce processus) ; avec `If-None-Match` à jour, la réponse est un 304.
+    """
+    user = await UserService.get_principal(db, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Utilisateur non trouvé"
         )
-    return user
+    return conditional_json(request, user_etag(user), lambda: dump_user_json(user))
 
 
 @router.post("/users", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -66,24 +271,121 @@ async def create_user(
     
     Permet de créer un utilisateur avec des privilèges spécifiques
     """
-    # Vérifier si l'email existe déjà
-    existing_user = await UserService.get_by_email(db, user_in.email)
-    if existing_user:
+    try:
+        user = await UserService.create_admin(db, user_in)
+    except UserConflictError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Un utilisateur avec cet email existe déjà"
+            detail=exc.detail
         )
-    
-    # Vérifier si le username existe déjà
-    existing_username = await UserService.get_by_username(db, user_in.username)
-    if existing_username:
+    return user
+
+
+@router.post("/users/bulk", response_model=BulkUserImportResult)
+async def bulk_create_users(
+    request: Request,
+    current_admin: Annotated[User, Depends(get_current_superuser)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Créer des utilisateurs en masse (admin seulement)
+
+    Le corps est un tableau JSON d'utilisateurs (même format que la création
+    unitaire), ou du NDJSON avec `Content-Type: application/x-ndjson`.
+    Chaque entrée reçoit son propre résultat : créée, en conflit ou invalide.
+
+    Les utilisateurs sont enregistrés par lots de 500, chacun validé
+    séparément : si l'import s'interrompt (erreur de base de données, pool
+    de hachage saturé), les entrées restantes sont en statut "error" et les
+    lots précédents restent enregistrés, comme l'indiquent leurs résultats
+    "created".
+    """
+    items = _parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(items) > settings.BULK_IMPORT_MAX_ROWS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Ce nom d'utilisateur est déjà pris"
+            detail=f"Au plus {settings.BULK_IMPORT_MAX_ROWS} utilisateurs par requête"
         )
-    
-    user = await UserService.create_admin(db, user_in)
-    return user
+
+    results: list[BulkUserResult | None] = [None] * len(items)
+    indexes, users_in = [], []
+    for index, item in enumerate(items):
+        try:
+            users_in.append(AdminUserCreate.model_validate(item))
+            indexes.append(index)
+        except ValidationError as exc:
+            results[index] = BulkUserResult(
+                index=index,
+                status="invalid",
+                detail=exc.errors(include_url=False, include_context=False, include_input=False),
+            )
+
+    outcomes = await UserService.create_many(db, users_in)
+    for index, (user_id, conflict) in zip(indexes, outcomes):
+        if user_id:
+            results[index] = BulkUserResult(index=index, status="created", id=user_id)
+        elif conflict == "error":
+            results[index] = BulkUserResult(
+                index=index,
+                status="error",
+                detail="Non importé : import interrompu, les lots précédents sont enregistrés",
+            )
+        else:
+            results[index] = BulkUserResult(
+                index=index, status="conflict", detail=CONFLICT_DETAILS[conflict]
+            )
+
+    created = sum(1 for result in results if result.status == "created")
+    return BulkUserImportResult(created=created, failed=len(results) - created, results=results)
+
+
+@router.post("/users/bulk/actions", response_model=BulkUserActionResult)
+async def bulk_user_action(
+    bulk_action: BulkUserAction,
+    current_admin: Annotated[User, Depends(get_current_superuser)],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Activer, désactiver, supprimer ou changer les privilèges d'utilisateurs en masse (admin seulement)
+
+    Les utilisateurs sont désignés par `ids` ou par un `filter` comportant au moins
+    un critère (un filtre vide est refusé). L'administrateur appelant est
+    toujours exclu des suppressions, désactivations et retraits de privilèges.
+    """
+    exclude_id = current_admin.id if bulk_action.action in SELF_PROTECTED_ACTIONS else None
+    affected = await UserService.bulk_action(
+        db,
+        bulk_action.action,
+        ids=bulk_action.ids,
+        user_filter=bulk_action.filter,
+        exclude_id=exclude_id,
+    )
+    return BulkUserActionResult(action=bulk_action.action, affected=affected)
+
+
+def _parse_bulk_body(body: bytes, content_type: str) -> list:
+    if "ndjson" in content_type:
+        items = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                # L'entrée sera rejetée individuellement par la validation
+                items.append(None)
+        return items
+
+    try:
+        items = json.loads(body)
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Le corps doit être un tableau JSON ou du NDJSON"
+        )
+    return items
 
 
 @router.patch("/users/{user_id}", response_model=UserResponse)
@@ -98,6 +400,7 @@ async def update_user(
     
     Permet de modifier tous les attributs d'un utilisateur, y compris les privilèges
     """
+    use_primary(db)
     user = await UserService.get_by_id(db, user_id)
     if not user:
         raise HTTPException(
@@ -105,24 +408,6 @@ async def update_user(
             detail="Utilisateur non trouvé"
         )
     
-    # Vérifier l'unicité de l'email si modifié
-    if user_update.email and user_update.email != user.email:
-        existing = await UserService.get_by_email(db, user_update.email)
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cet email est déjà utilisé"
-            )
-    
-    # Vérifier l'unicité du username si modifié
-    if user_update.username and user_update.username != user.username:
-        existing = await UserService.get_by_username(db, user_update.username)
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Ce nom d'utilisateur est déjà pris"
-            )
-    
     # Empêcher un admin de se retirer ses propres privilèges
     if user_id == current_admin.id and user_update.is_superuser is False:
         raise HTTPException(
@@ -130,7 +415,13 @@ async def update_user(
             detail="Vous ne pouvez pas retirer vos propres privilèges d'administrateur"
         )
     
-    updated_user = await UserService.update_admin(db, user, user_update)
+    try:
+        updated_user = await UserService.update_admin(db, user, user_update)
+    except UserConflictError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=exc.detail
+        )
     return updated_user
 
 
@@ -152,6 +443,7 @@ async def delete_user(
             detail="Vous ne pouvez pas supprimer votre propre compte"
         )
     
+    use_primary(db)
     user = await UserService.get_by_id(db, user_id)
     if not user:
         raise HTTPException(
@@ -159,4 +451,27 @@ async def delete_user(
             detail="Utilisateur non trouvé"
         )
     
-    await UserService.delete(db, user)
\ No newline at end of file
+    await UserService.delete(db, user)
+
+@router.get("/traces")
+async def list_traces(
+    current_admin: Annotated[User, Depends(get_current_superuser)],
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Dernières traces de requêtes, les plus récentes d'abord (admin seulement)"""
+    return [trace.summary() for trace in trace_buffer.recent(limit)]
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(
+    trace_id: str,
+    current_admin: Annotated[User, Depends(get_current_superuser)],
+):
+    """Étapes et profil éventuel d'une trace, en JSON (admin seulement)"""
+    trace = trace_buffer.get(trace_id)
+    if trace is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trace non trouvée (jamais enregistrée ou déjà évincée)"
+        )
+    return trace.export()
@@ -1,15 +1,35 @@
-from typing import Annotated, cast
+import math
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
-from app.core.security import create_access_token, create_refresh_token, decode_token
-from app.dependencies import get_current_active_user
+from app.core.login_throttle import login_throttle
+from app.core.metrics import login_lockouts, login_throttled
+from app.core.responses import conditional_json
+from app.core.security import decode_token
+from app.core.token_denylist import token_denylist
+from app.dependencies import (
+    get_current_active_user,
+    get_current_user,
+    get_introspection_client,
+    oauth2_scheme,
+)
 from app.models.user import User
-from app.schemas.user import Token, UserCreate, UserResponse, UserUpdate
-from app.services.user_service import UserService
+from app.schemas.user import (
+    IntrospectionRequest,
+    Token,
+    TokenIntrospection,
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+    dump_user_json,
+    user_etag,
+)
+from app.services.token_service import TokenService
+from app.services.user_service import UserConflictError, UserService
 
 router = APIRouter()
 
@@ -20,23 +40,13 @@ async def register(
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """Créer un nouveau compte utilisateur"""
-
-    email = cast(str, user_in.email)
-    existing_user = await UserService.get_by_email(db, email=email)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Un utilisateur avec cet email existe déjà"
-        )
-
-    existing_username = await UserService.get_by_username(db, user_in.username)
-    if existing_username:
+    try:
+        user = await UserService.create(db, user_in)
+    except UserConflictError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Ce nom d'utilisateur est déjà pris"
+            detail=exc.detail
         )
-
-    user = await UserService.create(db, user_in)
     return user
 
 
@@ -46,11 +56,24 @@ async def login(
         db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """Connexion et obtention de tokens"""
+    # Compte bloqué : refus avant toute requête SQL ou vérification argon2
+    retry_after = login_throttle.retry_after(form_data.username)
+    if retry_after:
+        login_throttled.inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop de tentatives de connexion. Réessayez plus tard.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
     user = await UserService.authenticate(db, form_data.username, form_data.password)
     is_active = None
     if user:
         is_active = user.is_active
+        login_throttle.record_success(form_data.username)
     if not user:
+        if login_throttle.record_failure(form_data.username):
+            login_lockouts.inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou mot de passe incorrect",
@@ -63,10 +86,7 @@ async def login(
             detail="Utilisateur inactif"
         )
 
-    return Token(
-        access_token=create_access_token(user.id),
-        refresh_token=create_refresh_token(user.id)
-    )
+    return TokenService.issue(user.id)
 
 
 @router.post("/refresh", response_model=Token)
@@ -74,7 +94,13 @@ async def refresh_token(
         refresh_token_var: str,
         db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    """Rafraîchir le token d'accès"""
+    """
+    Rafraîchir le token d'accès
+
+    Le token de rafraîchissement est à usage unique : la réponse en contient un
+    nouveau, de la même session. Présenter une seconde fois un token déjà
+    échangé révoque toute la session.
+    """
     payload = decode_token(refresh_token_var)
     if payload is None or payload.get("type") != "refresh":
         raise HTTPException(
@@ -82,26 +108,94 @@ async def refresh_token(
             detail="Token de rafraîchissement invalide"
         )
 
+    if not await TokenService.rotate(db, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de rafraîchissement révoqué ou déjà utilisé"
+        )
+
     user_id = payload.get("sub")
-    user = await UserService.get_by_id(db, user_id)
+    user = await UserService.get_principal(db, user_id)
     if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Utilisateur non trouvé ou inactif"
         )
 
-    return Token(
-        access_token=create_access_token(user.id),
-        refresh_token=create_refresh_token(user.id)
-    )
+    return TokenService.issue(user.id, family=payload["fam"])
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+        token: Annotated[str, Depends(oauth2_scheme)],
+        current_user: Annotated[User, Depends(get_current_user)],
+        db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """Fermer la session : révoque ce token d'accès et les tokens de rafraîchissement associés"""
+    await TokenService.revoke(db, decode_token(token))
+
+
+@router.post(
+    "/introspect",
+    response_model=list[TokenIntrospection],
+    response_model_exclude_none=True,
+)
+async def introspect_tokens(
+        introspection: IntrospectionRequest,
+        client: Annotated[str, Depends(get_introspection_client)],
+        db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Vérifier un lot de tokens (passerelles)
+
+    Réservé aux serveurs de ressources déclarés dans INTROSPECTION_CLIENTS,
+    authentifiés en HTTP Basic : sans cela, n'importe qui pourrait tester
+    des tokens et lire le profil de leurs titulaires.
+
+    Seuls les tokens d'accès peuvent être actifs : un token de rafraîchissement
+    n'a pas à être présenté à une passerelle, et un token déjà échangé n'est
+    connu que de la table revoked_tokens, pas de la liste en mémoire.
+
+    Les utilisateurs référencés sont chargés en une seule requête ; les résultats
+    sont retournés dans l'ordre des tokens reçus.
+    """
+    payloads = [
+        payload if payload and payload.get("type") == "access" else None
+        for payload in map(decode_token, introspection.tokens)
+    ]
+    user_ids = {payload["sub"] for payload in payloads if payload and payload.get("sub")}
+    users = await UserService.get_principals(db, user_ids)
+
+    results = []
+    for payload in payloads:
+        user = users.get(payload.get("sub")) if payload else None
+        if user is None or not user.is_active or token_denylist.is_revoked(payload):
+            results.append(TokenIntrospection(active=False))
+            continue
+
+        results.append(TokenIntrospection(
+            active=True,
+            sub=user.id,
+            type=payload.get("type"),
+            exp=payload.get("exp"),
+            username=user.username,
+            is_superuser=user.is_superuser,
+        ))
+    return results
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
+        request: Request,
         current_user: Annotated[User, Depends(get_current_active_user)]
 ):
-    """Obtenir les informations de l'utilisateur connecté"""
-    return current_user
+    """
+    Obtenir les informations de l'utilisateur connecté
+
+    Avec `If-None-Match` à jour : 304 sans corps. L'utilisateur venant du cache
+    des utilisateurs authentifiés, ce cas ne fait en général aucune requête SQL.
+    """
+    return conditional_json(request, user_etag(current_user), lambda: dump_user_json(current_user))
 
 
 @router.patch("/me", response_model=UserResponse)
@@ -111,24 +205,13 @@ async def update_current_user(
         db: Annotated[AsyncSession, Depends(get_db)]
 ):
     """Modifier les informations de l'utilisateur connecté"""
-    if user_update.email and user_update.email != current_user.email:
-        email = cast(str, user_update.email)
-        existing = await UserService.get_by_email(db, email)
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cet email est déjà utilisé"
-            )
-
-    if user_update.username and user_update.username != current_user.username:
-        existing = await UserService.get_by_username(db, user_update.username)
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Ce nom d'utilisateur est déjà pris"
-            )
-
-    user = await UserService.update(db, current_user, user_update)
+    try:
+        user = await UserService.update(db, current_user, user_update)
+    except UserConflictError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=exc.detail
+        )
     return user
 
 
@@ -0,0 +1,21 @@
+import json
+
+from fastapi import APIRouter, Response
+
+from app.config import settings
+from app.core.security import key_ring
+
+router = APIRouter()
+
+# Le jeu de clés ne change qu'au redémarrage : le corps est calculé une seule fois
+JWKS_BODY = json.dumps(key_ring.jwks() if key_ring else {"keys": []}).encode("utf-8")
+
+
+@router.get("/jwks.json")
+async def jwks():
+    """Clés publiques de vérification des tokens (RFC 7517)"""
+    return Response(
+        content=JWKS_BODY,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"},
+    )
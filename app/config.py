@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 from pydantic import field_validator, MySQLDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -27,12 +27,55 @@ class Settings(BaseSettings):
     DB_ECHO: bool = False
     DB_POOL_SIZE: int = 5
     DB_MAX_OVERFLOW: int = 10
+    DB_EXPOSE_CHECKOUTS: bool = False
+    DATABASE_REPLICA_URLS: list[str] = []
+    DATABASE_REPLICA_STRATEGY: Literal["round_robin", "least_busy"] = "round_robin"
+    DATABASE_REPLICA_HEALTH_INTERVAL_SECONDS: int = 10
 
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Tokens révoqués : resynchronisation depuis la base (autres processus) et
+    # largeur des tranches d'expiration de la liste en mémoire
+    TOKEN_DENYLIST_SYNC_SECONDS: float = 5.0
+    TOKEN_DENYLIST_BUCKET_SECONDS: int = 3600
+    # Serveurs de ressources autorisés à appeler /auth/introspect (HTTP Basic,
+    # identifiant -> secret) ; vide = introspection refusée à tous
+    INTROSPECTION_CLIENTS: dict[str, str] = {}
+
+    # Signature asymétrique (RS256 / ES256) : clés <kid>.pem, voir app/core/keys.py
+    JWT_KEYS_DIR: str | None = None
+    JWT_ACTIVE_KID: str | None = None
+    JWKS_CACHE_MAX_AGE: int = 300
+
+    # Password hashing (argon2 hors de la boucle d'événements)
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    # Coût argon2 (défauts de passlib) ; les hashes plus faibles sont mis à niveau
+    # à la connexion, jamais les plus coûteux. Toutes les instances doivent
+    # partager les mêmes valeurs : les calculer une fois avec
+    # python -m app.core.hash_calibration --target-ms 250
+    PASSWORD_HASH_TIME_COST: int = 3
+    PASSWORD_HASH_MEMORY_COST: int = 65536
+    PASSWORD_HASH_PARALLELISM: int = 4
+    # Calibrage au démarrage vers cette durée par hachage (0 = désactivé), sans
+    # descendre sous les deux valeurs ci-dessus. Propre à chaque instance : à
+    # réserver à un déploiement à instance unique
+    PASSWORD_HASH_CALIBRATE_TARGET_MS: int = 0
+    PASSWORD_HASH_CALIBRATE_MAX_MEMORY: int = 262_144
+
+    # Cache des utilisateurs authentifiés (0 = désactivé)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+
+    # Administration
+    BULK_IMPORT_MAX_ROWS: int = 50_000
+    # Statistiques utilisateurs : recalcul périodique et historique des inscriptions
+    USER_STATS_RECONCILE_SECONDS: int = 300
+    USER_STATS_SIGNUP_DAYS: int = 30
 
     # CORS
     CORS_ORIGINS: list[str] = ["http://localhost:3000", "http://localhost:8000"]
@@ -40,8 +83,44 @@ class Settings(BaseSettings):
     CORS_METHODS: list[str] = ["*"]
     CORS_HEADERS: list[str] = ["*"]
 
+    # Métriques Prometheus (GET /metrics)
+    METRICS_ENABLED: bool = True
+
+    # Traces par requête (voir app/core/tracing.py) : fraction tirée au sort et
+    # jeton de l'en-tête X-Trace qui force la trace ("" = en-tête ignoré)
+    TRACING_SAMPLE_RATE: float = 0.0
+    TRACING_HEADER_TOKEN: str = ""
+    TRACING_BUFFER_SIZE: int = 200
+    # Profil statistique des requêtes tracées plus lentes que TRACING_SLOW_MS
+    TRACING_PROFILE: bool = False
+    TRACING_PROFILE_INTERVAL_MS: float = 5.0
+    TRACING_SLOW_MS: float = 500.0
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_LOGIN_PER_MINUTE: int = 10
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+
+    # Contrôle d'admission : concurrence maximale par classe de routes, réduite
+    # automatiquement quand la latence dépasse la cible (voir app/core/admission.py)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_HASH_LIMIT: int = 8
+    ADMISSION_HASH_TARGET_MS: int = 500
+    ADMISSION_DB_LIMIT: int = 15
+    ADMISSION_DB_TARGET_MS: int = 200
+    ADMISSION_EXPORT_LIMIT: int = 2
+    ADMISSION_HEALTH_LIMIT: int = 32
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 1.0
+
+    # Blocage par compte après des échecs de connexion (voir app/core/login_throttle.py)
+    LOGIN_THROTTLE_THRESHOLD: int = 5
+    LOGIN_THROTTLE_BASE_DELAY_SECONDS: float = 1.0
+    LOGIN_THROTTLE_MAX_DELAY_SECONDS: float = 900.0
+    LOGIN_THROTTLE_RESET_SECONDS: float = 900.0
+    LOGIN_THROTTLE_MAX_KEYS: int = 100_000
+    # Fichier où conserver l'état entre deux redémarrages (None = en mémoire seulement)
+    LOGIN_THROTTLE_STATE_FILE: str | None = None
 
     @field_validator("SECRET_KEY")
     @classmethod
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from collections import deque
+
+
+class AdaptiveLimiter:
+    """
+    Limite de concurrence adaptative (AIMD) avec file d'attente bornée.
+
+    Au plus `limit` requêtes s'exécutent à la fois ; au-delà, jusqu'à
+    `max_queue` requêtes attendent une place pendant `queue_timeout` secondes,
+    les autres sont refusées immédiatement. Après chaque requête, si la latence
+    dépasse `target_latency` la limite est multipliée par `backoff` (au plus une
+    fois par intervalle de `target_latency`), sinon, quand la limite était
+    atteinte, elle augmente de `1 / limit`. Elle reste entre `min_limit` et
+    `max_limit`. Sans `target_latency`, la limite est fixe (`max_limit`).
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        target_latency: float | None = None,
+        max_queue: int = 32,
+        queue_timeout: float = 1.0,
+        backoff: float = 0.9,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max_limit)
+        self.target_latency = target_latency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Retourne False si la requête doit être refusée (file pleine ou attente trop longue)."""
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        except asyncio.CancelledError:
+            # Place accordée juste avant l'annulation : la rendre
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if not waiter.done() or waiter.cancelled():
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+
+    def release(self, latency: float | None = None, now: float | None = None) -> None:
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        if latency is not None and self.target_latency is not None:
+            if now is None:
+                now = time.monotonic()
+            if latency > self.target_latency:
+                if now - self._last_decrease >= self.target_latency:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = now
+            elif saturated:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Generic, Hashable, Iterable, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.database import WriteTrackingSession
+from app.core.metrics import Counter, Gauge, registry
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Cache LRU en mémoire dont les entrées expirent après `ttl` secondes.
+
+    Pas de verrou : le cache n'est utilisé que depuis la boucle d'événements.
+    Les accès sont comptés dans `requests` (étiquette "hit" ou "miss").
+    """
+
+    def __init__(self, max_size: int, ttl: float, requests: Counter | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.requests = requests
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self._count("miss")
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._count("miss")
+            return None
+
+        self._data.move_to_end(key)
+        self._count("hit")
+        return value
+
+    def _count(self, result: str) -> None:
+        if self.requests is not None:
+            self.requests.inc(result)
+
+    def set(self, key: K, value: V) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+# Utilisateurs authentifiés, indexés par id (voir UserService.get_principal)
+principal_cache: "TTLCache[str, User]" = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    requests=registry.register(Counter(
+        "auth_principal_cache_requests_total",
+        "Lectures du cache des utilisateurs authentifiés, par résultat",
+        ("result",),
+    )),
+)
+registry.register(Gauge(
+    "auth_principal_cache_entries",
+    "Utilisateurs présents dans le cache des utilisateurs authentifiés",
+    (),
+    lambda: [((), len(principal_cache))],
+))
+
+
+def invalidate_principals_on_commit(db: AsyncSession, user_ids: Iterable[str]) -> None:
+    """
+    Retire ces utilisateurs du cache au COMMIT de `db`, pas avant : une
+    lecture entre le flush et le COMMIT remettrait sinon l'ancienne ligne en
+    cache pour toute la durée du TTL. Abandonné au ROLLBACK.
+    """
+    db.info.setdefault("invalidated_principals", set()).update(user_ids)
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _invalidate_principals(session: WriteTrackingSession) -> None:
+    for user_id in session.info.pop("invalidated_principals", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(WriteTrackingSession, "after_soft_rollback")
+def _discard_invalidations(session: WriteTrackingSession, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop("invalidated_principals", None)
@@ -1,42 +1,229 @@
-from typing import AsyncGenerator
+import asyncio
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import AsyncGenerator, Callable, Iterator
+
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
 from app.config import settings
+from app.core.metrics import Gauge, db_pool_wait, registry
+from app.core.tracing import span
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
     pass
 
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DB_ECHO,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_pre_ping=True,
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Mesure l'attente d'une connexion (ouverture comprise) dans auth_db_pool_wait_seconds."""
+
+    label = "primary"
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_wait.observe(time.perf_counter() - start, self.label)
+
+    def recreate(self) -> "TimedQueuePool":
+        pool = super().recreate()
+        pool.label = self.label
+        return pool
+
+
+def _create_engine(url: str, label: str = "primary") -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        # Chaque session termine elle-même sa transaction (COMMIT, ou ROLLBACK à la
+        # fermeture) : le ROLLBACK du pool au retour de la connexion serait redondant.
+        pool_reset_on_return=None,
+    )
+    engine.sync_engine.pool.label = label
+    return engine
+
+
+engine = _create_engine(settings.DATABASE_URL)
+
+
+class ReplicaSet:
+    """
+    Réplicas en lecture : un pool par URL, choisi à tour de rôle ("round_robin")
+    ou selon le moins de connexions en cours ("least_busy"). Un réplica qui échoue
+    au contrôle de santé est écarté jusqu'au contrôle suivant réussi ; sans réplica
+    disponible, les lectures retombent sur le primaire.
+    """
+
+    def __init__(self, urls: list[str], strategy: str = "round_robin"):
+        self.engines = [
+            _create_engine(url, label=f"replica{index}") for index, url in enumerate(urls)
+        ]
+        self.strategy = strategy
+        self.healthy = [True] * len(self.engines)
+        self._turn = itertools.count()
+
+    def pick(self) -> AsyncEngine | None:
+        candidates = [
+            replica for replica, healthy in zip(self.engines, self.healthy) if healthy
+        ]
+        if not candidates:
+            return None
+        if self.strategy == "least_busy":
+            return min(candidates, key=lambda replica: replica.sync_engine.pool.checkedout())
+        return candidates[next(self._turn) % len(candidates)]
+
+    async def check_health(self) -> None:
+        for index, replica in enumerate(self.engines):
+            try:
+                async with replica.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                healthy = True
+            except Exception:
+                healthy = False
+            if healthy != self.healthy[index]:
+                logger.warning(
+                    "Réplica %s %s", replica.url.render_as_string(),
+                    "rétabli" if healthy else "écarté",
+                )
+            self.healthy[index] = healthy
+
+    async def monitor(self, interval: float) -> None:
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+
+replicas = ReplicaSet(
+    settings.DATABASE_REPLICA_URLS,
+    strategy=settings.DATABASE_REPLICA_STRATEGY,
 )
 
+
+class WriteTrackingSession(Session):
+    """
+    Session qui note dans `info["writes"]` toute écriture (flush ou DML).
+
+    Les SELECT sont envoyés à un réplica (le même pour toute la session) tant que
+    la session n'a pas écrit et n'a pas été forcée sur le primaire (`use_primary`),
+    pour que chaque requête relise ses propres écritures.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw) -> Engine:
+        if (
+            replicas.engines
+            and isinstance(clause, Select)
+            and not self._flushing
+            and not self.info.get("writes")
+            and not self.info.get("primary")
+        ):
+            if "replica" not in self.info:
+                self.info["replica"] = replicas.pick()
+            if self.info["replica"] is not None:
+                return self.info["replica"].sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _mark_flush(session: Session, flush_context) -> None:
+    session.info["writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _mark_dml(orm_execute_state) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["writes"] = True
+
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=WriteTrackingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
+# Nombre de connexions sorties du pool pendant la requête en cours
+pool_checkouts: ContextVar[list[int] | None] = ContextVar("pool_checkouts", default=None)
+
+
+def _count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    counter = pool_checkouts.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+for _engine in (engine, *replicas.engines):
+    event.listen(_engine.sync_engine, "checkout", _count_checkout)
+
+
+def _pool_gauge(read: Callable[[TimedQueuePool], int]) -> Callable[[], Iterator]:
+    def collect() -> Iterator[tuple[tuple[str], int]]:
+        for pool_engine in (engine, *replicas.engines):
+            pool = pool_engine.sync_engine.pool
+            yield (pool.label,), read(pool)
+    return collect
+
+
+registry.register(Gauge(
+    "auth_db_pool_checked_out",
+    "Connexions actuellement sorties du pool",
+    ("pool",),
+    _pool_gauge(lambda pool: pool.checkedout()),
+))
+registry.register(Gauge(
+    "auth_db_pool_overflow",
+    "Connexions ouvertes au-delà de DB_POOL_SIZE (négatif : places libres sous pool_size)",
+    ("pool",),
+    _pool_gauge(lambda pool: pool.overflow()),
+))
+
+
+def use_primary(session: AsyncSession) -> None:
+    """Envoie toutes les requêtes suivantes de la session au primaire."""
+    session.info["primary"] = True
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session de la requête.
+
+    FastAPI met en cache les dépendances d'une même requête : `get_current_user`
+    et l'endpoint partagent donc cette session. Aucune connexion n'est prise au
+    pool avant la première requête SQL, et le COMMIT n'est envoyé que si la
+    session a écrit ; une requête en lecture seule se termine par le ROLLBACK
+    de la fermeture.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session.info.get("writes"):
+                with span("session.commit"):
+                    await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
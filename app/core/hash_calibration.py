@@ -0,0 +1,75 @@
+"""
+Calibrage du coût argon2 sur la machine courante.
+
+    python -m app.core.hash_calibration --target-ms 250 [--max-memory-kib 262144]
+
+Affiche les valeurs PASSWORD_HASH_TIME_COST / PASSWORD_HASH_MEMORY_COST à
+reporter dans le .env de toutes les instances. Le même calcul est fait au
+démarrage si PASSWORD_HASH_CALIBRATE_TARGET_MS est défini, sans descendre
+sous les valeurs configurées.
+
+Méthode (RFC 9106, §4) : la mémoire la plus grande possible, réduite de moitié
+tant qu'un seul passage dépasse la cible, puis le plus grand nombre de passages
+(time_cost) qui reste sous la cible.
+"""
+import argparse
+import statistics
+import time
+
+from passlib.hash import argon2
+
+# Plancher recommandé par l'OWASP pour argon2id (19 Mio)
+MIN_MEMORY_COST = 19 * 1024
+MAX_TIME_COST = 20
+
+
+def measure_argon2(time_cost: int, memory_cost: int, parallelism: int, samples: int = 3) -> float:
+    """Durée médiane d'un hachage, en millisecondes."""
+    hasher = argon2.using(rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def calibrate_argon2(
+    target_ms: float,
+    max_memory_cost: int = 256 * 1024,
+    parallelism: int = 4,
+) -> tuple[int, int, float]:
+    """Retourne `(time_cost, memory_cost, durée en ms)` pour approcher `target_ms`."""
+    memory_cost = max(max_memory_cost, MIN_MEMORY_COST)
+    elapsed = measure_argon2(1, memory_cost, parallelism)
+    while elapsed > target_ms and memory_cost // 2 >= MIN_MEMORY_COST:
+        memory_cost //= 2
+        elapsed = measure_argon2(1, memory_cost, parallelism)
+
+    time_cost = 1
+    while time_cost < MAX_TIME_COST:
+        candidate = measure_argon2(time_cost + 1, memory_cost, parallelism)
+        if candidate > target_ms:
+            break
+        time_cost, elapsed = time_cost + 1, candidate
+    return time_cost, memory_cost, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrage du coût argon2")
+    parser.add_argument("--target-ms", type=float, required=True)
+    parser.add_argument("--max-memory-kib", type=int, default=256 * 1024)
+    parser.add_argument("--parallelism", type=int, default=4)
+    args = parser.parse_args()
+
+    time_cost, memory_cost, elapsed = calibrate_argon2(
+        args.target_ms, args.max_memory_kib, args.parallelism
+    )
+    print(f"# {elapsed:.0f} ms par hachage sur cette machine (cible {args.target_ms:.0f} ms)")
+    print(f"PASSWORD_HASH_TIME_COST={time_cost}")
+    print(f"PASSWORD_HASH_MEMORY_COST={memory_cost}")
+    print(f"PASSWORD_HASH_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
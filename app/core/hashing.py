@@ -0,0 +1,110 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusy(Exception):
+    """Levée quand la file d'attente du pool de hachage est pleine."""
+
+
+class PasswordHasherPool:
+    """
+    Exécute les opérations argon2 hors de la boucle d'événements.
+
+    argon2 bloque le CPU pendant plusieurs dizaines de millisecondes : on délègue
+    donc le travail à un pool de threads (argon2-cffi relâche le GIL) ou de
+    processus, et on refuse les nouvelles demandes au-delà de `max_queue`
+    opérations en attente plutôt que de laisser la latence exploser.
+    Avec `workers=0`, les opérations sont exécutées directement (ancien comportement).
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 4, max_queue: int = 64):
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Executor | None = None
+        self._initializer: tuple[Callable[..., None], tuple] | None = None
+
+    def set_initializer(self, func: Callable[..., None], *args: Any) -> None:
+        """
+        Fonction exécutée au lancement de chaque processus du pool, pour y
+        reporter une configuration modifiée après l'import (calibrage argon2).
+        Le pool existant est recréé.
+        """
+        self._initializer = (func, args)
+        self.shutdown()
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                initializer, initargs = self._initializer or (None, ())
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=initializer,
+                    initargs=initargs,
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.workers <= 0:
+            return func(*args)
+
+        # Opérations en cours + opérations en file d'attente
+        if self.pending >= self.workers + self.max_queue:
+            raise PasswordHashingBusy()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    async def map(self, func: Callable[[Any], T], items: list[Any]) -> list[T]:
+        """
+        Applique `func` à un lot en parallèle sur tout le pool.
+
+        Au plus `workers` éléments du lot sont soumis à la fois, pour que les
+        requêtes interactives (login…) puissent s'intercaler entre eux.
+        """
+        if self.workers <= 0:
+            return [func(item) for item in items]
+
+        if self.pending >= self.workers + self.max_queue:
+            raise PasswordHashingBusy()
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def submit(item: Any) -> T:
+            async with semaphore:
+                self.pending += 1
+                try:
+                    return await loop.run_in_executor(executor, func, item)
+                finally:
+                    self.pending -= 1
+
+        return list(await asyncio.gather(*(submit(item) for item in items)))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
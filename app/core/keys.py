@@ -0,0 +1,73 @@
+"""
+Clés de signature asymétriques des tokens (RS256 / ES256).
+
+Chaque fichier `<kid>.pem` de `JWT_KEYS_DIR` est une clé ; le nom du fichier
+sert d'identifiant (`kid`). Les tokens sont signés avec la clé active
+(`JWT_ACTIVE_KID`, ou à défaut la dernière clé privée par ordre de `kid`) et
+vérifiés avec la clé désignée par le `kid` de leur en-tête.
+
+Rotation : ajouter la nouvelle clé privée puis la rendre active. L'ancienne
+peut être réduite à sa clé publique, et doit rester dans le répertoire jusqu'à
+l'expiration des derniers tokens qu'elle a signés (REFRESH_TOKEN_EXPIRE_DAYS).
+
+    openssl genpkey -algorithm RSA -pkeyopt rsa_keygen_bits:2048 -out keys/2026-10.pem
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from jose import jwk
+from jose.backends.base import Key
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    verifying_key: Key
+    signing_key: Key | None = None
+
+    def public_jwk(self) -> dict[str, Any]:
+        return {**self.verifying_key.to_dict(), "kid": self.kid, "use": "sig"}
+
+
+class KeyRing:
+    def __init__(self, keys: list[SigningKey], active_kid: str | None = None):
+        self._keys = {key.kid: key for key in keys}
+        signing_kids = sorted(key.kid for key in keys if key.signing_key is not None)
+        if active_kid is None and signing_kids:
+            active_kid = signing_kids[-1]
+        if active_kid not in signing_kids:
+            raise ValueError(f"Aucune clé privée pour le kid actif '{active_kid}'")
+        self.active = self._keys[active_kid]
+
+    def get(self, kid: str | None) -> SigningKey | None:
+        if kid is None:
+            return None
+        return self._keys.get(kid)
+
+    def jwks(self) -> dict[str, Any]:
+        return {"keys": [key.public_jwk() for key in self._keys.values()]}
+
+
+def _load_key(path: Path, algorithm: str) -> SigningKey:
+    key = jwk.construct(path.read_text(), algorithm)
+    if key.is_public():
+        return SigningKey(kid=path.stem, verifying_key=key)
+    return SigningKey(kid=path.stem, verifying_key=key.public_key(), signing_key=key)
+
+
+def load_key_ring() -> KeyRing | None:
+    """Retourne None pour les algorithmes HMAC (signature avec SECRET_KEY)."""
+    if settings.ALGORITHM.startswith("HS"):
+        return None
+
+    if not settings.JWT_KEYS_DIR:
+        raise ValueError(f"JWT_KEYS_DIR est requis avec l'algorithme {settings.ALGORITHM}")
+
+    keys = [
+        _load_key(path, settings.ALGORITHM)
+        for path in sorted(Path(settings.JWT_KEYS_DIR).glob("*.pem"))
+    ]
+    return KeyRing(keys, active_kid=settings.JWT_ACTIVE_KID)
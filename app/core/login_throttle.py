@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Account:
+    __slots__ = ("failures", "locked_until", "last_failure")
+
+    def __init__(self, failures: int = 0, locked_until: float = 0.0, last_failure: float = 0.0):
+        self.failures = failures
+        self.locked_until = locked_until
+        self.last_failure = last_failure
+
+
+class LoginThrottle:
+    """
+    Échecs de connexion par compte, avec blocage temporaire exponentiel.
+
+    À partir de `threshold` échecs consécutifs, chaque nouvel échec bloque le
+    compte `base_delay * 2^(échecs - threshold)` secondes (au plus `max_delay`).
+    Le compteur repart de zéro après une connexion réussie ou `reset_after`
+    secondes sans échec.
+
+    La clé est un condensat de l'email soumis, que le compte existe ou non : un
+    email inconnu est bloqué exactement comme un email existant. Les entrées
+    (16 octets de clé + 3 nombres) sont évincées au-delà de `max_keys` (LRU).
+    Les horodatages sont en temps réel (`time.time`) pour survivre à un
+    redémarrage via `save` / `load`.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        threshold: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 900.0,
+        reset_after: float = 900.0,
+        max_keys: int = 100_000,
+    ):
+        self._secret = hashlib.sha256(secret.encode("utf-8")).digest()
+        self.threshold = threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.reset_after = reset_after
+        self.max_keys = max_keys
+        self._accounts: OrderedDict[bytes, _Account] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def _key(self, email: str) -> bytes:
+        return hashlib.blake2b(
+            email.strip().lower().encode("utf-8"), digest_size=16, key=self._secret
+        ).digest()
+
+    def retry_after(self, email: str, now: float | None = None) -> float:
+        """Secondes restantes de blocage pour `email`, 0 si la tentative est permise."""
+        account = self._accounts.get(self._key(email))
+        if account is None:
+            return 0.0
+        if now is None:
+            now = time.time()
+        return max(account.locked_until - now, 0.0)
+
+    def record_failure(self, email: str, now: float | None = None) -> float:
+        """Enregistre un échec ; retourne la durée du blocage qui en résulte (0 si aucun)."""
+        if now is None:
+            now = time.time()
+        key = self._key(email)
+        account = self._accounts.get(key)
+        if account is None:
+            account = self._accounts[key] = _Account()
+            if len(self._accounts) > self.max_keys:
+                self._accounts.popitem(last=False)
+        else:
+            self._accounts.move_to_end(key)
+            if now - account.last_failure > self.reset_after:
+                account.failures = 0
+
+        account.failures += 1
+        account.last_failure = now
+        if account.failures < self.threshold:
+            return 0.0
+
+        delay = min(self.base_delay * 2 ** (account.failures - self.threshold), self.max_delay)
+        account.locked_until = now + delay
+        return delay
+
+    def record_success(self, email: str) -> None:
+        self._accounts.pop(self._key(email), None)
+
+    def save(self, path: str) -> None:
+        """Écrit les entrées encore utiles (la clé est un condensat, pas l'email)."""
+        now = time.time()
+        state = {
+            key.hex(): [account.failures, account.locked_until, account.last_failure]
+            for key, account in self._accounts.items()
+            if now - account.last_failure <= self.reset_after or account.locked_until > now
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        if not Path(path).exists():
+            return
+        try:
+            with open(path, encoding="utf-8") as file:
+                state = json.load(file)
+            for key, (failures, locked_until, last_failure) in state.items():
+                self._accounts[bytes.fromhex(key)] = _Account(failures, locked_until, last_failure)
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning("État du limiteur de connexion illisible (%s) : ignoré", exc)
+            self._accounts.clear()
+        while len(self._accounts) > self.max_keys:
+            self._accounts.popitem(last=False)
+
+
+login_throttle = LoginThrottle(
+    secret=settings.SECRET_KEY,
+    threshold=settings.LOGIN_THROTTLE_THRESHOLD,
+    base_delay=settings.LOGIN_THROTTLE_BASE_DELAY_SECONDS,
+    max_delay=settings.LOGIN_THROTTLE_MAX_DELAY_SECONDS,
+    reset_after=settings.LOGIN_THROTTLE_RESET_SECONDS,
+    max_keys=settings.LOGIN_THROTTLE_MAX_KEYS,
+)
@@ -0,0 +1,256 @@
+"""
+Métriques du service au format texte de Prometheus, exposées par `GET /metrics`.
+
+Les métriques vivent en mémoire, par processus : avec plusieurs workers,
+Prometheus doit interroger chacun d'eux. Une observation coûte un accès à un
+dict et une recherche dichotomique dans les bornes de l'histogramme ; avec
+METRICS_ENABLED=false, elle se réduit à un test (voir benchmarks/metrics_overhead.py).
+Les hachages exécutés dans un pool de processus ne sont pas mesurés.
+"""
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Iterable, Iterator, TypeVar
+
+from app.config import settings
+from app.core.tracing import span
+
+T = TypeVar("T")
+
+# Bornes par défaut (secondes), de la requête SQL rapide à la requête HTTP lente
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: dict[str, "Metric"] = {}
+
+    def register(self, metric: "Metric") -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrique déjà enregistrée : {metric.name}")
+        metric.registry = self
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.registry: Registry | None = None
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Compteur monotone, éventuellement découpé par étiquettes."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        if self.registry is not None and not self.registry.enabled:
+            return
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self) -> Iterator[str]:
+        for labelvalues, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """
+    Histogramme à bornes fixes. Par série : un compteur par borne (non cumulé,
+    cumulé au rendu), un pour +Inf, puis la somme des valeurs.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], list[float]] = {}
+        # Les hachages argon2 sont observés depuis les threads du pool
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        if self.registry is not None and not self.registry.enabled:
+            return
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, *labelvalues: str) -> int:
+        series = self._series.get(labelvalues)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            snapshot = sorted((key, list(series)) for key, series in self._series.items())
+        for labelvalues, series in snapshot:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, None), series):
+                cumulative += count
+                le = f'le="{"+Inf" if bound is None else _format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(series[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Gauge(Metric):
+    """Valeurs instantanées lues au moment du rendu par `collect`."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...],
+        collect: Callable[[], Iterable[tuple[tuple[str, ...], float]]],
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+
+    def samples(self) -> Iterator[str]:
+        for labelvalues, value in self.collect():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+def timed(
+    histogram: Histogram, span_prefix: str | None = None
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Mesure la durée d'une coroutine, étiquetée par le nom de la fonction.
+    Avec `span_prefix`, l'appel est aussi une étape de la trace courante.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        name = func.__name__
+        span_name = f"{span_prefix}.{name}" if span_prefix else None
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            start = time.perf_counter()
+            try:
+                if span_name is None:
+                    return await func(*args, **kwargs)
+                with span(span_name):
+                    return await func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, name)
+
+        return wrapper
+
+    return decorator
+
+
+registry = Registry(enabled=settings.METRICS_ENABLED)
+
+# HTTP
+http_request_duration = registry.register(Histogram(
+    "auth_http_request_duration_seconds",
+    "Durée des requêtes HTTP par route",
+    ("method", "route", "status"),
+))
+
+# Hachage et tokens
+password_hashing_duration = registry.register(Histogram(
+    "auth_password_hashing_seconds",
+    "Durée des opérations argon2 (hash, verify)",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+))
+jwt_duration = registry.register(Histogram(
+    "auth_jwt_seconds",
+    "Durée de signature et de vérification des tokens",
+    ("operation",),
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01),
+))
+password_hash_params = registry.register(Counter(
+    "auth_password_hash_params_total",
+    "Connexions réussies par paramètres argon2 du hash stocké",
+    ("params",),
+))
+password_rehashes = registry.register(Counter(
+    "auth_password_rehashes_total",
+    "Hashes mis à niveau vers les paramètres courants lors d'une connexion",
+))
+
+# Base de données
+user_service_duration = registry.register(Histogram(
+    "auth_user_service_seconds",
+    "Durée des méthodes de UserService, requêtes SQL comprises",
+    ("method",),
+))
+db_pool_wait = registry.register(Histogram(
+    "auth_db_pool_wait_seconds",
+    "Attente d'une connexion du pool",
+    ("pool",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+))
+
+# Protection
+rate_limit_requests = registry.register(Counter(
+    "auth_rate_limit_requests_total",
+    "Requêtes vues par la limitation de débit par IP",
+    ("policy", "outcome"),
+))
+login_throttled = registry.register(Counter(
+    "auth_login_throttled_total",
+    "Tentatives de connexion refusées avant vérification (compte bloqué)",
+))
+login_lockouts = registry.register(Counter(
+    "auth_login_lockouts_total",
+    "Blocages de compte déclenchés par des échecs de connexion",
+))
+admission_rejected = registry.register(Counter(
+    "auth_admission_rejected_total",
+    "Requêtes refusées (503) par le contrôle d'admission, par classe de routes",
+    ("route_class",),
+))
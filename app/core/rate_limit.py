@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Budget de `limit` unités par fenêtre de `period` secondes."""
+    limit: int
+    period: int = 60
+
+
+class _Window:
+    __slots__ = ("index", "previous", "current")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.previous = 0
+        self.current = 0
+
+
+class SlidingWindowLimiter:
+    """
+    Limiteur à fenêtre glissante approximée (sliding window counter).
+
+    Pour chaque clé on ne conserve que deux compteurs : celui de la fenêtre
+    courante et celui de la précédente, pondéré par la part de celle-ci encore
+    couverte par la fenêtre glissante. La vérification est en O(1) et les clés
+    inactives sont évincées au-delà de `max_keys` (LRU).
+    """
+
+    def __init__(self, policy: RateLimitPolicy, max_keys: int = 100_000):
+        self.policy = policy
+        self.max_keys = max_keys
+        self._windows: OrderedDict[Hashable, _Window] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+    def hit(self, key: Hashable, cost: int = 1, now: float | None = None) -> float:
+        """
+        Consomme `cost` unités pour `key`.
+
+        Retourne 0 si la requête est acceptée, sinon le nombre de secondes à
+        attendre avant de réessayer.
+        """
+        if now is None:
+            now = time.monotonic()
+        period = self.policy.period
+        index = int(now // period)
+
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _Window(index)
+            if len(self._windows) > self.max_keys:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(key)
+            if window.index != index:
+                window.previous = window.current if window.index == index - 1 else 0
+                window.current = 0
+                window.index = index
+
+        elapsed = now - index * period
+        estimated = window.previous * (period - elapsed) / period + window.current
+        if estimated + cost > self.policy.limit:
+            return max(period - elapsed, 1.0)
+
+        window.current += cost
+        return 0.0
@@ -0,0 +1,40 @@
+from typing import Callable
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class RawJSONResponse(Response):
+    """
+    Réponse dont le corps est déjà du JSON encodé (bytes).
+
+    Retournée directement par un endpoint, elle court-circuite la validation
+    du `response_model` par FastAPI, qui reste utilisé pour la documentation.
+    """
+    media_type = "application/json"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Comparaison faible de If-None-Match (RFC 9110, 13.1.2) : `W/` est ignoré."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_json(request: Request, etag: str, render: Callable[[], bytes]) -> Response:
+    """
+    304 sans corps si le client a déjà cette version, sinon le JSON de `render`.
+
+    `render` n'est appelé que pour une réponse 200 : un 304 ne coûte ni
+    sérialisation ni corps. Les réponses dépendent du token : le cache est
+    privé, et revalidé à chaque utilisation.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return RawJSONResponse(render(), headers=headers)
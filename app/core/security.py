@@ -1,26 +1,156 @@
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
+from uuid import uuid4
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from passlib.hash import argon2
 
 from app.config import settings
+from app.core.hashing import password_hasher
+from app.core.keys import load_key_ring
+from app.core.metrics import jwt_duration, password_hashing_duration
+from app.core.tracing import span
+
+# None en HS256 : les tokens sont alors signés et vérifiés avec SECRET_KEY
+key_ring = load_key_ring()
 
 pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
+    argon2__rounds=settings.PASSWORD_HASH_TIME_COST,
+    argon2__memory_cost=settings.PASSWORD_HASH_MEMORY_COST,
+    argon2__parallelism=settings.PASSWORD_HASH_PARALLELISM,
 )
 
+# (time_cost, memory_cost) des nouveaux hashes, tenu à jour par configure_argon2
+_argon2_cost = (settings.PASSWORD_HASH_TIME_COST, settings.PASSWORD_HASH_MEMORY_COST)
+
+
+def configure_argon2(time_cost: int, memory_cost: int, parallelism: int) -> None:
+    """Change le coût des nouveaux hashes (et des processus du pool de hachage)."""
+    _update_argon2(time_cost, memory_cost, parallelism)
+    password_hasher.set_initializer(_update_argon2, time_cost, memory_cost, parallelism)
+
+
+def _update_argon2(time_cost: int, memory_cost: int, parallelism: int) -> None:
+    global _argon2_cost
+    _argon2_cost = (time_cost, memory_cost)
+    pwd_context.update(
+        argon2__rounds=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+
+
+def hash_parameters(hashed_password: str) -> str:
+    """Paramètres d'un hash stocké, ex. "argon2id m=65536,t=3,p=4"."""
+    parts = hashed_password.split("$")
+    if len(parts) < 5:
+        return "inconnu"
+    return f"{parts[1]} {parts[3]}"
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    start = time.perf_counter()
+    try:
+        return pwd_context.verify(plain_password, hashed_password)
+    finally:
+        password_hashing_duration.observe(time.perf_counter() - start, "verify")
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Vérifie le mot de passe ; si le hash est plus faible que les paramètres
+    courants, retourne aussi un nouveau hash calculé avec ceux-ci.
+
+    Un hash plus coûteux n'est jamais réécrit : `verify_and_update` de passlib
+    réécrirait tout hash aux paramètres différents, et deux instances aux
+    réglages différents se renverraient les hashes à chaque connexion.
+    """
+    start = time.perf_counter()
+    try:
+        if not pwd_context.verify(plain_password, hashed_password):
+            return False, None
+    finally:
+        password_hashing_duration.observe(time.perf_counter() - start, "verify")
+    if not needs_rehash(hashed_password):
+        return True, None
+    return True, get_password_hash(plain_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Hash argon2id de coût (passages ou mémoire) inférieur au coût courant, ou autre format."""
+    try:
+        parsed = argon2.from_string(hashed_password)
+    except ValueError:
+        return True
+    time_cost, memory_cost = _argon2_cost
+    return parsed.type != "id" or parsed.rounds < time_cost or parsed.memory_cost < memory_cost
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    start = time.perf_counter()
+    try:
+        return pwd_context.hash(password)
+    finally:
+        password_hashing_duration.observe(time.perf_counter() - start, "hash")
+
+
+# Les étapes argon2 de la trace incluent l'attente d'un worker du pool
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    with span("verify_password"):
+        return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    with span("verify_password"):
+        return await password_hasher.run(verify_and_update_password, plain_password, hashed_password)
 
 
-def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
+# Hash d'un mot de passe aléatoire, calculé au premier besoin (après un
+# éventuel calibrage) pour avoir le coût des vrais hashes
+_dummy_password_hash: str | None = None
+
+
+async def verify_dummy_password_async(plain_password: str) -> None:
+    """Même travail qu'une vérification réelle, pour un email inconnu."""
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = await get_password_hash_async(secrets.token_urlsafe(32))
+    await verify_password_async(plain_password, _dummy_password_hash)
+
+
+async def get_password_hash_async(password: str) -> str:
+    with span("hash_password"):
+        return await password_hasher.run(get_password_hash, password)
+
+
+async def get_password_hashes_async(passwords: list[str]) -> list[str]:
+    return await password_hasher.map(get_password_hash, passwords)
+
+
+def new_token_id() -> str:
+    """Identifiant de token (`jti`) ou de famille (`fam`) : 32 caractères hexadécimaux."""
+    return uuid4().hex
+
+
+# Chaque token porte un `jti` unique et le `fam` de sa session : la famille
+# naît à la connexion et se transmet à chaque rafraîchissement, ce qui permet
+# de révoquer d'un coup tous les tokens d'une session (voir TokenService).
+
+def create_access_token(
+    subject: str | Any,
+    expires_delta: timedelta | None = None,
+    family: str | None = None,
+) -> str:
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
@@ -28,19 +158,67 @@ def create_access_token(subject: str | Any, expires_delta: timedelta | None = No
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode = {"exp": expire, "sub": str(subject), "type": "access"}
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "type": "access",
+        "jti": new_token_id(),
+        "fam": family or new_token_id(),
+    }
+    return _encode(to_encode)
 
 
-def create_refresh_token(subject: str | Any) -> str:
+def create_refresh_token(subject: str | Any, family: str | None = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode = {"exp": expire, "sub": str(subject), "type": "refresh"}
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "type": "refresh",
+        "jti": new_token_id(),
+        "fam": family or new_token_id(),
+    }
+    return _encode(to_encode)
+
+
+def _encode(claims: dict[str, Any]) -> str:
+    start = time.perf_counter()
+    try:
+        with span("encode_token"):
+            return _sign(claims)
+    finally:
+        jwt_duration.observe(time.perf_counter() - start, "encode")
+
+
+def _sign(claims: dict[str, Any]) -> str:
+    if key_ring is None:
+        return jwt.encode(claims, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+    active = key_ring.active
+    return jwt.encode(
+        claims,
+        active.signing_key,
+        algorithm=settings.ALGORITHM,
+        headers={"kid": active.kid},
+    )
 
 
 def decode_token(token: str) -> dict[str, Any] | None:
+    start = time.perf_counter()
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
+        with span("decode_token"):
+            return _verify(token)
+    finally:
+        jwt_duration.observe(time.perf_counter() - start, "decode")
+
+
+def _verify(token: str) -> dict[str, Any] | None:
+    try:
+        if key_ring is None:
+            return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+        key = key_ring.get(jwt.get_unverified_header(token).get("kid"))
+        if key is None:
+            return None
+        return jwt.decode(token, key.verifying_key, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
\ No newline at end of file
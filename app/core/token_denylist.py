@@ -0,0 +1,88 @@
+import time
+from typing import Any
+
+from app.config import settings
+from app.core.metrics import Counter, Gauge, registry
+
+
+class TokenDenylist:
+    """
+    Identifiants révoqués (`jti` d'un token ou `fam` d'une session), gardés
+    jusqu'à l'expiration du dernier token qu'ils peuvent concerner.
+
+    Chaque identifiant (32 caractères hexadécimaux) est stocké sur 16 octets
+    dans un dict qui donne sa tranche d'expiration ; les tranches de
+    `bucket_seconds` regroupent les identifiants qui expirent ensemble, pour
+    que `purge` supprime une tranche entière sans parcourir tout le dict. Le
+    test d'appartenance est exact (pas de faux positif, contrairement à un
+    filtre de Bloom) et ne fait aucune requête SQL.
+
+    Pas de verrou : utilisé seulement depuis la boucle d'événements.
+    """
+
+    def __init__(self, bucket_seconds: int = 3600):
+        self.bucket_seconds = bucket_seconds
+        self._buckets: dict[int, set[bytes]] = {}
+        self._entries: dict[bytes, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token_id: str) -> bytes:
+        try:
+            return bytes.fromhex(token_id)
+        except ValueError:
+            return token_id.encode("utf-8")
+
+    def add(self, token_id: str, expires_at: float) -> None:
+        """`expires_at` : horodatage (secondes) après lequel l'entrée est inutile."""
+        key = self._key(token_id)
+        bucket = int(expires_at // self.bucket_seconds) + 1
+        previous = self._entries.get(key)
+        if previous is not None:
+            if previous >= bucket:
+                return
+            self._buckets[previous].discard(key)
+        self._entries[key] = bucket
+        self._buckets.setdefault(bucket, set()).add(key)
+
+    def __contains__(self, token_id: str) -> bool:
+        return self._key(token_id) in self._entries
+
+    def is_revoked(self, payload: dict[str, Any]) -> bool:
+        """Le token lui-même ou sa famille a été révoqué."""
+        if not self._entries:
+            return False
+        jti, family = payload.get("jti"), payload.get("fam")
+        return (jti is not None and jti in self) or (family is not None and family in self)
+
+    def purge(self, now: float | None = None) -> int:
+        """Supprime les tranches entièrement expirées ; retourne le nombre d'entrées retirées."""
+        if now is None:
+            now = time.time()
+        current = int(now // self.bucket_seconds)
+        removed = 0
+        for bucket in [bucket for bucket in self._buckets if bucket <= current]:
+            for key in self._buckets.pop(bucket):
+                del self._entries[key]
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._entries.clear()
+
+
+token_denylist = TokenDenylist(bucket_seconds=settings.TOKEN_DENYLIST_BUCKET_SECONDS)
+
+refresh_token_reuse = registry.register(Counter(
+    "auth_refresh_token_reuse_total",
+    "Tokens de rafraîchissement présentés une seconde fois (famille révoquée)",
+))
+registry.register(Gauge(
+    "auth_token_denylist_entries",
+    "Identifiants de tokens et de sessions révoqués gardés en mémoire",
+    (),
+    lambda: [((), len(token_denylist))],
+))
@@ -0,0 +1,237 @@
+"""
+Traces par requête : durée de chaque étape (décodage du token, méthodes de
+UserService, argon2, COMMIT, sérialisation) et, pour les requêtes lentes,
+profil statistique des piles d'appels.
+
+Une requête n'est tracée que si TracingMiddleware l'a tirée au sort
+(TRACING_SAMPLE_RATE) ou si elle porte l'en-tête X-Trace avec le jeton
+TRACING_HEADER_TOKEN. Hors trace, `span` se réduit à la lecture d'une
+ContextVar ; sans échantillonnage ni jeton, le middleware n'est pas installé.
+Les traces terminées sont gardées dans un tampon circulaire
+(`GET /api/v1/admin/traces`).
+"""
+import asyncio
+import secrets
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, ContextManager, Iterator
+
+from app.config import settings
+
+_current_trace: ContextVar["Trace | None"] = ContextVar("current_trace", default=None)
+
+_NO_SPAN = nullcontext()
+
+
+class Span:
+    __slots__ = ("name", "start", "duration", "depth")
+
+    def __init__(self, name: str, start: float, depth: int):
+        self.name = name
+        self.start = start
+        self.duration = 0.0
+        self.depth = depth
+
+
+class StackSampler:
+    """
+    Profil statistique d'une requête : toutes les `interval` secondes, la pile
+    courante du thread de la boucle d'événements est relevée et comptée sous
+    forme repliée ("module:fonction;module:fonction…", le format des flame
+    graphs).
+
+    Seuls comptent les relevés où la tâche de la requête est celle qui
+    s'exécute : le travail des autres requêtes et l'attente d'E/S n'y sont
+    pas. Le travail délégué au pool (hachages argon2) ou à une tâche fille
+    (corps d'une StreamingResponse) n'y apparaît pas non plus.
+    Les relevés sont faits par un thread unique partagé par toutes les
+    requêtes profilées (`_sampling_thread`) ; `start` et `stop` ne bloquent pas.
+    """
+
+    def __init__(self, interval: float, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.thread_id = threading.get_ident()
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+
+    def start(self) -> None:
+        _sampling_thread.add(self)
+
+    def stop(self) -> None:
+        _sampling_thread.discard(self)
+
+    def sample(self, frames: dict[int, Any]) -> None:
+        frame = frames.get(self.thread_id)
+        if frame is None or asyncio.current_task(self.loop) is not self.task:
+            return
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(names))] += 1
+        self.samples += 1
+
+    def export(self) -> dict[str, Any]:
+        return {
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "stacks": dict(self.stacks.most_common()),
+        }
+
+
+class SamplingThread:
+    """
+    Thread démon unique qui relève les piles pour tous les StackSampler
+    actifs, au plus petit de leurs intervalles. Démarré au premier profil,
+    il attend sans rien relever quand aucun n'est actif.
+    """
+
+    def __init__(self) -> None:
+        self._samplers: set[StackSampler] = set()
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add(self, sampler: StackSampler) -> None:
+        with self._lock:
+            self._samplers.add(sampler)
+            self._active.set()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+
+    def discard(self, sampler: StackSampler) -> None:
+        with self._lock:
+            self._samplers.discard(sampler)
+            if not self._samplers:
+                self._active.clear()
+
+    def _run(self) -> None:
+        while True:
+            self._active.wait()
+            with self._lock:
+                samplers = list(self._samplers)
+            if not samplers:
+                continue
+            time.sleep(min(sampler.interval for sampler in samplers))
+            frames = sys._current_frames()
+            with self._lock:
+                for sampler in self._samplers:
+                    sampler.sample(frames)
+            del frames
+
+
+class Trace:
+    def __init__(self, method: str, path: str, forced: bool = False):
+        self.id = secrets.token_hex(8)
+        self.method = method
+        self.path = path
+        self.forced = forced
+        self.status: int | None = None
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.spans: list[Span] = []
+        self.profile: dict[str, Any] | None = None
+        self._depth = 0
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        span = Span(name, time.perf_counter() - self.start, self._depth)
+        self.spans.append(span)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            span.duration = time.perf_counter() - self.start - span.start
+
+    def finish(self, status: int) -> None:
+        self.status = status
+        self.duration = time.perf_counter() - self.start
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3),
+            "spans": len(self.spans),
+            "profiled": self.profile is not None,
+        }
+
+    def export(self) -> dict[str, Any]:
+        return {
+            **self.summary(),
+            "spans": [
+                {
+                    "name": span.name,
+                    "start_ms": round(span.start * 1000, 3),
+                    "duration_ms": round(span.duration * 1000, 3),
+                    "depth": span.depth,
+                }
+                for span in self.spans
+            ],
+            "profile": self.profile,
+        }
+
+
+class TraceBuffer:
+    """Dernières traces terminées, les plus anciennes évincées au-delà de `size`."""
+
+    def __init__(self, size: int):
+        self._traces: deque[Trace] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+    def add(self, trace: Trace) -> None:
+        self._traces.append(trace)
+
+    def get(self, trace_id: str) -> Trace | None:
+        for trace in self._traces:
+            if trace.id == trace_id:
+                return trace
+        return None
+
+    def recent(self, limit: int | None = None) -> list[Trace]:
+        traces = list(reversed(self._traces))
+        return traces if limit is None else traces[:limit]
+
+    def clear(self) -> None:
+        self._traces.clear()
+
+
+def current_trace() -> Trace | None:
+    return _current_trace.get()
+
+
+def start_trace(trace: Trace) -> Any:
+    return _current_trace.set(trace)
+
+
+def end_trace(token: Any) -> None:
+    _current_trace.reset(token)
+
+
+def span(name: str) -> ContextManager[None]:
+    """Étape de la trace courante ; sans trace, un contexte vide partagé."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return trace.span(name)
+
+
+trace_buffer = TraceBuffer(settings.TRACING_BUFFER_SIZE)
+_sampling_thread = SamplingThread()
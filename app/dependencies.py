@@ -1,15 +1,22 @@
+import hmac
+import logging
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import HTTPBasic, HTTPBasicCredentials, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.core.database import get_db
 from app.core.security import decode_token
+from app.core.token_denylist import token_denylist
 from app.models.user import User
 from app.services.user_service import UserService
 
+logger = logging.getLogger(__name__)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+introspection_basic = HTTPBasic(auto_error=False)
 
 
 async def get_current_user(
@@ -23,17 +30,19 @@ async def get_current_user(
     )
 
     payload = decode_token(token)
-    print(f"DEBUG: Payload reçu: {payload}")
     if payload is None or payload.get("type") != "access":
-        print("DEBUG: Echec sur le check du type ou payload None")
+        logger.debug("Token rejeté : invalide, expiré ou de type %r", payload and payload.get("type"))
+        raise credentials_exception
+
+    # Session fermée ou famille compromise : vérifié en mémoire, sans SQL
+    if token_denylist.is_revoked(payload):
         raise credentials_exception
 
     user_id: str = payload.get("sub")
-    print(f"DEBUG: User ID extrait: '{user_id}'")
     if user_id is None:
         raise credentials_exception
 
-    user = await UserService.get_by_id(db, user_id)
+    user = await UserService.get_principal(db, user_id)
     if user is None:
         raise credentials_exception
 
@@ -55,4 +64,23 @@ async def get_current_superuser(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Privilèges insuffisants. Accès administrateur requis"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+async def get_introspection_client(
+    credentials: Annotated[HTTPBasicCredentials | None, Depends(introspection_basic)]
+) -> str:
+    """Serveur de ressources authentifié (RFC 7662, 2.1) ; retourne son identifiant."""
+    expected = settings.INTROSPECTION_CLIENTS.get(credentials.username) if credentials else None
+    # Comparaison faite même pour un client inconnu : même durée de réponse
+    valid = hmac.compare_digest(
+        (credentials.password if credentials else "").encode("utf-8"),
+        (expected or "").encode("utf-8"),
+    )
+    if expected is None or not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Client d'introspection non authentifié",
+            headers={"WWW-Authenticate": 'Basic realm="introspection"'},
+        )
+    return credentials.username
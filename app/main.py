@@ -1,21 +1,83 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.api import well_known
 from app.api.v1.router import api_router
 from app.config import settings
-from app.core.database import engine, Base
+from app.core.database import AsyncSessionLocal, engine, Base, replicas
+from app.core.hash_calibration import calibrate_argon2
+from app.core.hashing import PasswordHashingBusy, password_hasher
+from app.core.login_throttle import login_throttle
+from app.core.metrics import registry
+from app.core.security import configure_argon2
+from app.middleware.admission_middleware import AdmissionControlMiddleware
 from app.middleware.auth_middleware import RateLimitMiddleware
+from app.middleware.db_middleware import PoolCheckoutMiddleware
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.tracing_middleware import TracingMiddleware
+from app.services.stats_service import user_stats
+from app.services.token_service import TokenService, denylist_monitor
+
+
+logger = logging.getLogger(__name__)
+
+
+async def calibrate_password_hashing() -> None:
+    time_cost, memory_cost, elapsed = await asyncio.to_thread(
+        calibrate_argon2,
+        settings.PASSWORD_HASH_CALIBRATE_TARGET_MS,
+        settings.PASSWORD_HASH_CALIBRATE_MAX_MEMORY,
+        settings.PASSWORD_HASH_PARALLELISM,
+    )
+    # Jamais sous les réglages : une machine lente ou chargée au démarrage
+    # affaiblirait les nouveaux hashes
+    time_cost = max(time_cost, settings.PASSWORD_HASH_TIME_COST)
+    memory_cost = max(memory_cost, settings.PASSWORD_HASH_MEMORY_COST)
+    configure_argon2(time_cost, memory_cost, settings.PASSWORD_HASH_PARALLELISM)
+    logger.info(
+        "argon2 calibré : time_cost=%d, memory_cost=%d (%.0f ms par hachage mesurés)",
+        time_cost, memory_cost, elapsed,
+    )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    if settings.PASSWORD_HASH_CALIBRATE_TARGET_MS:
+        await calibrate_password_hashing()
+    if settings.LOGIN_THROTTLE_STATE_FILE:
+        login_throttle.load(settings.LOGIN_THROTTLE_STATE_FILE)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await TokenService.sync_denylist(db)
+    replica_monitor = None
+    if replicas.engines:
+        replica_monitor = asyncio.create_task(
+            replicas.monitor(settings.DATABASE_REPLICA_HEALTH_INTERVAL_SECONDS)
+        )
+    stats_reconciler = asyncio.create_task(
+        user_stats.monitor(settings.USER_STATS_RECONCILE_SECONDS)
+    )
+    denylist_sync = asyncio.create_task(
+        denylist_monitor(settings.TOKEN_DENYLIST_SYNC_SECONDS)
+    )
     yield
     # Shutdown
+    for task in (replica_monitor, stats_reconciler, denylist_sync):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    if settings.LOGIN_THROTTLE_STATE_FILE:
+        login_throttle.save(settings.LOGIN_THROTTLE_STATE_FILE)
+    password_hasher.shutdown()
+    await replicas.dispose()
     await engine.dispose()
 
 
@@ -34,15 +96,48 @@ app.add_middleware(
     allow_credentials=settings.CORS_CREDENTIALS,
     allow_methods=settings.CORS_METHODS,
     allow_headers=settings.CORS_HEADERS,
+    expose_headers=["X-Next-Cursor", "X-Trace-Id"],
 )
 
+# Contrôle d'admission (derrière la limitation de débit)
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
 # Rate Limiting
 app.add_middleware(RateLimitMiddleware)
 
+# Diagnostic du pool de connexions
+if settings.DB_EXPOSE_CHECKOUTS:
+    app.add_middleware(PoolCheckoutMiddleware)
+
+# Traces par requête (installé seulement si une requête peut être tracée)
+if settings.TRACING_SAMPLE_RATE > 0 or settings.TRACING_HEADER_TOKEN:
+    app.add_middleware(TracingMiddleware)
+
+# Métriques (le plus à l'extérieur : la durée inclut tous les middlewares)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(request: Request, exc: PasswordHashingBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service surchargé. Réessayez plus tard."},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Routes
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
+app.include_router(well_known.router, prefix="/.well-known", tags=["Well-known"])
 
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "version": settings.APP_VERSION}
\ No newline at end of file
+    return {"status": "healthy", "version": settings.APP_VERSION}
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,99 @@
+import re
+import time
+
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.core.admission import AdaptiveLimiter
+from app.core.metrics import admission_rejected
+from app.middleware.asgi import json_body, send_json
+
+API = settings.API_V1_PREFIX
+
+# Routes qui calculent un hash argon2 (le PATCH peut changer le mot de passe)
+HASH_ROUTES = {
+    ("POST", f"{API}/auth/login"),
+    ("POST", f"{API}/auth/register"),
+    ("PATCH", f"{API}/auth/me"),
+    ("POST", f"{API}/admin/users"),
+    ("POST", f"{API}/admin/users/bulk"),
+}
+_ADMIN_USER_PATH = re.compile(rf"^{re.escape(API)}/admin/users/[^/]+$")
+
+SERVICE_UNAVAILABLE_BODY = json_body({"detail": "Service surchargé. Réessayez plus tard."})
+
+
+def classify(method: str, path: str) -> str:
+    """Classe de la requête : "hash", "export", "db" ou "health"."""
+    if (method, path) in HASH_ROUTES:
+        return "hash"
+    if method == "PATCH" and _ADMIN_USER_PATH.match(path):
+        return "hash"
+    if path == f"{API}/admin/users/export":
+        return "export"
+    if path.startswith(API):
+        return "db"
+    # /health, /metrics, /.well-known : ni base de données ni hachage
+    return "health"
+
+
+def default_limiters() -> dict[str, AdaptiveLimiter]:
+    queue = {
+        "max_queue": settings.ADMISSION_MAX_QUEUE,
+        "queue_timeout": settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    }
+    return {
+        "hash": AdaptiveLimiter(
+            max_limit=settings.ADMISSION_HASH_LIMIT,
+            target_latency=settings.ADMISSION_HASH_TARGET_MS / 1000,
+            **queue,
+        ),
+        "db": AdaptiveLimiter(
+            max_limit=settings.ADMISSION_DB_LIMIT,
+            target_latency=settings.ADMISSION_DB_TARGET_MS / 1000,
+            **queue,
+        ),
+        # Un export garde une connexion pendant toute sa durée : limite fixe
+        "export": AdaptiveLimiter(max_limit=settings.ADMISSION_EXPORT_LIMIT, max_queue=0),
+        "health": AdaptiveLimiter(max_limit=settings.ADMISSION_HEALTH_LIMIT, max_queue=0),
+    }
+
+
+class AdmissionControlMiddleware:
+    """
+    Limite la concurrence par classe de routes et refuse vite (503 +
+    Retry-After) quand la file d'une classe dépasse son budget : une rafale de
+    connexions ne peut pas retarder /health ni les routes de lecture.
+    """
+
+    def __init__(self, app: ASGIApp, limiters: dict[str, AdaptiveLimiter] | None = None):
+        self.app = app
+        self.limiters = default_limiters() if limiters is None else limiters
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify(scope["method"], scope["path"])
+        limiter = self.limiters.get(route_class)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            admission_rejected.inc(route_class)
+            await send_json(
+                send,
+                status.HTTP_503_SERVICE_UNAVAILABLE,
+                SERVICE_UNAVAILABLE_BODY,
+                headers=[(b"retry-after", b"1")],
+            )
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - start)
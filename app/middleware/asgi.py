@@ -0,0 +1,28 @@
+import json
+from typing import Any
+
+from starlette.types import Send
+
+
+def json_body(content: Any) -> bytes:
+    """Encode `content` comme le ferait JSONResponse, pour des corps précalculés."""
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+async def send_json(
+    send: Send,
+    status_code: int,
+    body: bytes,
+    headers: list[tuple[bytes, bytes]] | None = None,
+) -> None:
+    """Envoie une réponse JSON complète sans construire de Response Starlette."""
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+            *(headers or []),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -1,37 +1,70 @@
-import time
-from collections import defaultdict
-from typing import Callable
+import math
 
-from fastapi import Request, Response, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.config import settings
+from app.core.metrics import rate_limit_requests
+from app.core.rate_limit import RateLimitPolicy, SlidingWindowLimiter
+from app.middleware.asgi import json_body, send_json
 
+DEFAULT_POLICY = "default"
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, calls: int = settings.RATE_LIMIT_PER_MINUTE, period: int = 60):
-        super().__init__(app)
-        self.calls = calls
-        self.period = period
-        self.requests = defaultdict(list)
+# Politiques nommées : chaque politique a son propre budget par client
+DEFAULT_POLICIES = {
+    DEFAULT_POLICY: RateLimitPolicy(limit=settings.RATE_LIMIT_PER_MINUTE),
+    "credentials": RateLimitPolicy(limit=settings.RATE_LIMIT_LOGIN_PER_MINUTE),
+}
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        client_ip = request.client.host
-        now = time.time()
+# (méthode, chemin) -> (politique, coût). Les autres routes coûtent 1 sur "default".
+DEFAULT_ROUTES = {
+    ("POST", f"{settings.API_V1_PREFIX}/auth/login"): ("credentials", 1),
+    ("POST", f"{settings.API_V1_PREFIX}/auth/register"): ("credentials", 2),
+}
 
-        # Nettoyer les anciennes requêtes
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if now - req_time < self.period
-        ]
+TOO_MANY_REQUESTS_BODY = json_body({"detail": "Trop de requêtes. Réessayez plus tard."})
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI pur : un 429 est émis sans construire de Request ni de Response."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls: int = settings.RATE_LIMIT_PER_MINUTE,
+        period: int = 60,
+        policies: dict[str, RateLimitPolicy] | None = None,
+        routes: dict[tuple[str, str], tuple[str, int]] | None = None,
+        max_keys: int = settings.RATE_LIMIT_MAX_KEYS,
+    ):
+        self.app = app
+        policies = {**DEFAULT_POLICIES, **(policies or {})}
+        policies[DEFAULT_POLICY] = RateLimitPolicy(limit=calls, period=period)
+        self.limiters = {
+            name: SlidingWindowLimiter(policy, max_keys=max_keys)
+            for name, policy in policies.items()
+        }
+        self.routes = DEFAULT_ROUTES if routes is None else routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        policy, cost = self.routes.get((scope["method"], scope["path"]), (DEFAULT_POLICY, 1))
 
         # Vérifier la limite
-        if len(self.requests[client_ip]) >= self.calls:
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={"detail": "Trop de requêtes. Réessayez plus tard."}
+        retry_after = self.limiters[policy].hit(client_ip, cost)
+        rate_limit_requests.inc(policy, "rejected" if retry_after else "accepted")
+        if retry_after:
+            await send_json(
+                send,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                TOO_MANY_REQUESTS_BODY,
+                headers=[(b"retry-after", str(math.ceil(retry_after)).encode("latin-1"))],
             )
+            return
 
-        self.requests[client_ip].append(now)
-        return await call_next(request)
\ No newline at end of file
+        await self.app(scope, receive, send)
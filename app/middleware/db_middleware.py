@@ -0,0 +1,31 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.database import pool_checkouts
+
+
+class PoolCheckoutMiddleware:
+    """Ajoute l'en-tête `X-DB-Checkouts` : connexions prises au pool par la requête."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = [0]
+        token = pool_checkouts.set(counter)
+
+        async def send_with_checkouts(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-checkouts", str(counter[0]).encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_checkouts)
+        finally:
+            pool_checkouts.reset(token)
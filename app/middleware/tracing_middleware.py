@@ -0,0 +1,83 @@
+import hmac
+import random
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.core.tracing import StackSampler, Trace, end_trace, start_trace, trace_buffer
+
+TRACE_HEADER = "x-trace"
+TRACE_ID_HEADER = b"x-trace-id"
+
+
+class TracingMiddleware:
+    """
+    Trace une fraction des requêtes (TRACING_SAMPLE_RATE), plus celles qui
+    présentent l'en-tête X-Trace avec le jeton TRACING_HEADER_TOKEN. La réponse
+    d'une requête tracée porte X-Trace-Id.
+
+    Avec TRACING_PROFILE, chaque requête tracée est échantillonnée par un
+    StackSampler (un seul thread de relevé pour tout le processus) ; le
+    profil n'est conservé que si la requête dépasse TRACING_SLOW_MS, ou si
+    la trace a été demandée par l'en-tête.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = settings.TRACING_SAMPLE_RATE,
+        header_token: str = settings.TRACING_HEADER_TOKEN,
+        profile: bool = settings.TRACING_PROFILE,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.header_token = header_token.encode("utf-8")
+        self.profile = profile
+        self.profile_interval = settings.TRACING_PROFILE_INTERVAL_MS / 1000
+        self.slow_threshold = settings.TRACING_SLOW_MS / 1000
+
+    def _forced(self, scope: Scope) -> bool:
+        if not self.header_token:
+            return False
+        value = Headers(scope=scope).get(TRACE_HEADER)
+        return value is not None and hmac.compare_digest(value.encode("utf-8"), self.header_token)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        forced = self._forced(scope)
+        if not forced and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(scope["method"], scope["path"], forced=forced)
+        status_code = 500
+
+        async def send_with_trace_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (TRACE_ID_HEADER, trace.id.encode("ascii")),
+                ]
+            await send(message)
+
+        sampler = None
+        if self.profile:
+            sampler = StackSampler(self.profile_interval)
+            sampler.start()
+        token = start_trace(trace)
+        try:
+            await self.app(scope, receive, send_with_trace_id)
+        finally:
+            end_trace(token)
+            trace.finish(status_code)
+            if sampler is not None:
+                sampler.stop()
+                if forced or trace.duration >= self.slow_threshold:
+                    trace.profile = sampler.export()
+            trace_buffer.add(trace)
@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+from app.models.types import UTCDateTime
+
+
+class RevokedToken(Base):
+    """
+    Identifiants de tokens révoqués, et `jti` des tokens de rafraîchissement
+    déjà échangés (kind="rotated") : la clé primaire garantit qu'un token
+    n'est échangé qu'une fois, même entre plusieurs processus.
+
+    Une ligne peut être supprimée après `expires_at` (voir TokenService.purge_expired).
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    token_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # "token" (un jti), "family" (toute une session) ou "rotated"
+    kind: Mapped[str] = mapped_column(String(16), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(UTCDateTime(), index=True, nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(
+        UTCDateTime(),
+        default=lambda: datetime.now(timezone.utc),
+        index=True,
+        nullable=False
+    )
@@ -1,14 +1,23 @@
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import Boolean, DateTime, String, Text
+from sqlalchemy import Boolean, Index, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.database import Base
+from app.models.types import UTCDateTime
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Pagination par clé (created_at, id), voir UserService.get_page
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Recherche plein texte sur le nom complet, voir UserService.search
+        Index("ix_users_full_name_fulltext", "full_name", mysql_prefix="FULLTEXT").ddl_if(
+            dialect="mysql"
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36),
@@ -18,17 +27,24 @@ class User(Base):
     )
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
-    hashed_password: Mapped[str] = mapped_column(Text, nullable=False)
+    # Jamais chargé par défaut : seul UserService.authenticate le lit (undefer).
+    # Un accès sans chargement lève une erreur au lieu d'un lazy load implicite.
+    hashed_password: Mapped[str] = mapped_column(
+        Text,
+        nullable=False,
+        deferred=True,
+        deferred_raiseload=True
+    )
     full_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
+        UTCDateTime(),
         default=lambda: datetime.now(timezone.utc),
         nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
+        UTCDateTime(),
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
         nullable=False
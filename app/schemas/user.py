@@ -1,5 +1,11 @@
-from datetime import datetime
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+import hashlib
+from datetime import date, datetime
+from typing import Any, Iterable, Literal
+
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, TypeAdapter, model_validator
+from typing_extensions import TypedDict
+
+from app.core.tracing import span
 
 
 class UserBase(BaseModel):
@@ -28,12 +34,113 @@ class UserResponse(UserBase):
     created_at: datetime
     updated_at: datetime
 
+
+class UserRecord(TypedDict):
+    """
+    Même JSON que `UserResponse` (mêmes champs, même ordre), mais sérialisé sans
+    validation : les valeurs viennent de la base et ne repassent pas par EmailStr.
+    """
+    email: str
+    username: str
+    full_name: str | None
+    id: str
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+USER_RECORD_FIELDS = tuple(UserResponse.model_fields)
+assert USER_RECORD_FIELDS == tuple(UserRecord.__annotations__)
+
+user_record_adapter = TypeAdapter(UserRecord)
+user_records_adapter = TypeAdapter(list[UserRecord])
+
+
+def dump_user_json(user: Any) -> bytes:
+    """JSON d'un `User` (ou d'une ligne de colonnes publiques) au format `UserResponse`."""
+    with span("serialize"):
+        return user_record_adapter.dump_json(
+            {field: getattr(user, field) for field in USER_RECORD_FIELDS}
+        )
+
+
+def user_etag(user: Any) -> str:
+    """
+    ETag fort d'un utilisateur, calculé sans sérialisation : condensat de l'id,
+    de `updated_at` et des autres champs publics. Les champs s'ajoutent à
+    `updated_at` parce que MySQL le stocke à la seconde : deux modifications
+    dans la même seconde changent quand même l'ETag.
+    """
+    values = repr(tuple(getattr(user, field) for field in USER_RECORD_FIELDS))
+    return f'"{hashlib.blake2b(values.encode("utf-8"), digest_size=16).hexdigest()}"'
+
+
+def dump_users_json(users: Iterable[Any]) -> bytes:
+    """JSON d'une liste de `User` au format `list[UserResponse]`."""
+    with span("serialize"):
+        return user_records_adapter.dump_json([
+            {field: getattr(user, field) for field in USER_RECORD_FIELDS}
+            for user in users
+        ])
+
+
 class AdminUserCreate(UserBase):
     password: str = Field(min_length=8, max_length=100)
     is_active: bool = True
     is_superuser: bool = False
 
 
+class BulkUserResult(BaseModel):
+    index: int
+    # "error" : non importé, l'import s'est arrêté sur une erreur ; les
+    # entrées "created" des lots précédents restent enregistrées
+    status: Literal["created", "conflict", "invalid", "error"]
+    id: str | None = None
+    detail: str | list | None = None
+
+
+class BulkUserImportResult(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkUserResult]
+
+
+class UserFilter(BaseModel):
+    is_active: bool | None = None
+    is_superuser: bool | None = None
+    created_before: datetime | None = None
+    created_after: datetime | None = None
+
+
+class BulkUserAction(BaseModel):
+    action: Literal["activate", "deactivate", "delete", "grant_superuser", "revoke_superuser"]
+    ids: list[str] | None = Field(None, min_length=1, max_length=100_000)
+    filter: UserFilter | None = None
+
+    @model_validator(mode="after")
+    def check_target(self) -> "BulkUserAction":
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Fournir soit ids, soit filter")
+        # Un filtre vide désignerait toute la table
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("Le filtre doit comporter au moins un critère")
+        return self
+
+
+class BulkUserActionResult(BaseModel):
+    action: str
+    affected: int
+
+
+class UserStatsResponse(BaseModel):
+    total: int
+    active: int
+    superusers: int
+    signups_per_day: dict[date, int]
+    reconciled_at: datetime | None
+
+
 class AdminUserUpdate(BaseModel):
     email: EmailStr | None = None
     username: str | None = Field(None, min_length=3, max_length=50)
@@ -51,4 +158,17 @@ class Token(BaseModel):
 class TokenPayload(BaseModel):
     sub: str
     exp: int
-    type: str
\ No newline at end of file
+    type: str
+
+
+class IntrospectionRequest(BaseModel):
+    tokens: list[str] = Field(min_length=1, max_length=100)
+
+
+class TokenIntrospection(BaseModel):
+    active: bool
+    sub: str | None = None
+    type: str | None = None
+    exp: int | None = None
+    username: str | None = None
+    is_superuser: bool | None = None
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import case, event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.database import AsyncSessionLocal, WriteTrackingSession
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+
+class UserStats:
+    """
+    Compteurs d'utilisateurs tenus à jour en mémoire.
+
+    Les services enregistrent des deltas dans la session (`record`) ; ils ne
+    sont appliqués qu'au COMMIT et abandonnés au ROLLBACK. Les compteurs sont
+    recalculés périodiquement (`reconcile`) pour intégrer les écritures des
+    autres processus et corriger toute dérive.
+    """
+
+    def __init__(self, signup_days: int = 30):
+        self.signup_days = signup_days
+        self.total = 0
+        self.active = 0
+        self.superusers = 0
+        self.signups: dict[date, int] = {}
+        self.reconciled_at: datetime | None = None
+        self.stale = True
+
+    def record(
+        self,
+        db: AsyncSession,
+        total: int = 0,
+        active: int = 0,
+        superusers: int = 0,
+        created_at: datetime | None = None,
+    ) -> None:
+        db.info.setdefault("user_stats", []).append((total, active, superusers, created_at))
+
+    def mark_stale(self, db: AsyncSession) -> None:
+        """Pour les écritures dont l'effet sur les compteurs n'est pas connu."""
+        db.info["user_stats_stale"] = True
+
+    def apply(self, total: int, active: int, superusers: int, created_at: datetime | None) -> None:
+        self.total += total
+        self.active += active
+        self.superusers += superusers
+        if created_at is not None:
+            day = created_at.date()
+            self.signups[day] = self.signups.get(day, 0) + total
+
+    def signups_per_day(self) -> dict[date, int]:
+        since = datetime.now(timezone.utc).date() - timedelta(days=self.signup_days - 1)
+        for day in [day for day in self.signups if day < since]:
+            del self.signups[day]
+        return dict(sorted(self.signups.items()))
+
+    async def reconcile(self, db: AsyncSession) -> None:
+        result = await db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(case((User.is_active, 1), else_=0)), 0),
+                func.coalesce(func.sum(case((User.is_superuser, 1), else_=0)), 0),
+            ).select_from(User)
+        )
+        total, active, superusers = result.one()
+
+        since = datetime.now(timezone.utc).date() - timedelta(days=self.signup_days - 1)
+        day = func.date(User.created_at)
+        result = await db.execute(
+            select(day, func.count())
+            .where(User.created_at >= datetime.combine(since, datetime.min.time(), timezone.utc))
+            .group_by(day)
+        )
+
+        self.total, self.active, self.superusers = int(total), int(active), int(superusers)
+        self.signups = {date.fromisoformat(str(day)): count for day, count in result}
+        self.reconciled_at = datetime.now(timezone.utc)
+        self.stale = False
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        if self.stale:
+            await self.reconcile(db)
+
+    async def monitor(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.reconcile(db)
+            except Exception:
+                logger.exception("Échec du recalcul des statistiques utilisateurs")
+
+
+user_stats = UserStats(signup_days=settings.USER_STATS_SIGNUP_DAYS)
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _apply_user_stats(session: WriteTrackingSession) -> None:
+    for deltas in session.info.pop("user_stats", ()):
+        user_stats.apply(*deltas)
+    if session.info.pop("user_stats_stale", False):
+        user_stats.stale = True
+
+
+@event.listens_for(WriteTrackingSession, "after_soft_rollback")
+def _discard_user_stats(session: WriteTrackingSession, previous_transaction) -> None:
+    # Un SAVEPOINT annulé ne concerne que ses propres écritures
+    if not previous_transaction.nested:
+        session.info.pop("user_stats", None)
+        session.info.pop("user_stats_stale", None)
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.database import AsyncSessionLocal, WriteTrackingSession, use_primary
+from app.core.security import create_access_token, create_refresh_token, new_token_id
+from app.core.token_denylist import refresh_token_reuse, token_denylist
+from app.models.revoked_token import RevokedToken
+from app.schemas.user import Token
+
+logger = logging.getLogger(__name__)
+
+# Types de lignes de revoked_tokens chargés dans la liste en mémoire ; les
+# "rotated" ne servent qu'à détecter la réutilisation, en base
+DENYLIST_KINDS = ("token", "family")
+
+
+class TokenService:
+    """
+    Émission, rotation et révocation des tokens.
+
+    Un token de rafraîchissement ne sert qu'une fois : l'échanger enregistre
+    son `jti` dans revoked_tokens. S'il est présenté de nouveau, c'est qu'il
+    a fuité (ou que le client l'a réutilisé) : toute sa famille est révoquée,
+    y compris les tokens d'accès et le token de rafraîchissement émis à sa
+    place. Les révocations sont appliquées à la liste en mémoire au COMMIT,
+    puis propagées aux autres processus par `sync_denylist`.
+    """
+
+    @staticmethod
+    def issue(user_id: str, family: str | None = None) -> Token:
+        family = family or new_token_id()
+        return Token(
+            access_token=create_access_token(user_id, family=family),
+            refresh_token=create_refresh_token(user_id, family=family),
+        )
+
+    @staticmethod
+    async def rotate(db: AsyncSession, payload: dict[str, Any]) -> bool:
+        """
+        Marque le token de rafraîchissement comme échangé. Retourne False s'il
+        est révoqué, sans identifiants, ou déjà échangé (sa famille est alors
+        révoquée).
+        """
+        jti, family = payload.get("jti"), payload.get("fam")
+        if not jti or not family or token_denylist.is_revoked(payload):
+            return False
+
+        try:
+            async with db.begin_nested():
+                db.add(RevokedToken(
+                    token_id=jti,
+                    kind="rotated",
+                    expires_at=datetime.fromtimestamp(payload["exp"], timezone.utc),
+                ))
+        except IntegrityError:
+            logger.warning("Token de rafraîchissement réutilisé : famille %s révoquée", family)
+            refresh_token_reuse.inc()
+            await TokenService.revoke_family(db, family)
+            # Validé tout de suite : l'endpoint répond 401, ce qui annulerait
+            # la transaction de la requête
+            await db.commit()
+            return False
+        return True
+
+    @staticmethod
+    async def revoke_family(db: AsyncSession, family: str) -> None:
+        # Le dernier token de la famille expire au plus tard une durée de
+        # rafraîchissement après maintenant
+        expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        await db.merge(RevokedToken(token_id=family, kind="family", expires_at=expires_at))
+        # Flush : marque la session comme ayant écrit, donc validée par get_db
+        await db.flush()
+        db.info.setdefault("revoked_tokens", []).append((family, expires_at.timestamp()))
+
+    @staticmethod
+    async def revoke(db: AsyncSession, payload: dict[str, Any]) -> None:
+        """Révoque la session du token (sa famille), ou le token seul s'il n'en a pas."""
+        if payload.get("fam"):
+            await TokenService.revoke_family(db, payload["fam"])
+        elif payload.get("jti"):
+            expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
+            await db.merge(RevokedToken(token_id=payload["jti"], kind="token", expires_at=expires_at))
+            await db.flush()
+            db.info.setdefault("revoked_tokens", []).append((payload["jti"], expires_at.timestamp()))
+
+    @staticmethod
+    async def sync_denylist(db: AsyncSession, since: datetime | None = None) -> int:
+        """
+        Charge les révocations encore utiles (toutes, ou enregistrées depuis `since`).
+
+        Lu sur le primaire : une révocation arrivée sur un réplica après la
+        fenêtre de relecture ne serait jamais chargée.
+        """
+        use_primary(db)
+        now = datetime.now(timezone.utc)
+        query = select(RevokedToken.token_id, RevokedToken.expires_at).where(
+            RevokedToken.kind.in_(DENYLIST_KINDS),
+            RevokedToken.expires_at > now,
+        )
+        if since is not None:
+            query = query.where(RevokedToken.revoked_at >= since)
+        rows = (await db.execute(query)).all()
+        for token_id, expires_at in rows:
+            token_denylist.add(token_id, expires_at.timestamp())
+        return len(rows)
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession) -> int:
+        result = await db.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc))
+        )
+        await db.commit()
+        return result.rowcount
+
+
+async def denylist_monitor(interval: float) -> None:
+    """
+    Recharge périodiquement les révocations des autres processus. Chaque passe
+    relit aussi l'intervalle précédent, pour ne pas manquer une révocation
+    validée (COMMIT) après la passe qui aurait dû la voir.
+    """
+    synced_at = purged_at = datetime.now(timezone.utc)
+    purge_every = timedelta(seconds=token_denylist.bucket_seconds)
+    while True:
+        await asyncio.sleep(interval)
+        started_at = datetime.now(timezone.utc)
+        try:
+            async with AsyncSessionLocal() as db:
+                await TokenService.sync_denylist(db, since=synced_at - timedelta(seconds=interval))
+                if started_at - purged_at >= purge_every:
+                    await TokenService.purge_expired(db)
+                    purged_at = started_at
+            token_denylist.purge()
+            synced_at = started_at
+        except Exception:
+            logger.exception("Échec de la synchronisation des tokens révoqués")
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _apply_revocations(session: WriteTrackingSession) -> None:
+    for token_id, expires_at in session.info.pop("revoked_tokens", ()):
+        token_denylist.add(token_id, expires_at)
+
+
+@event.listens_for(WriteTrackingSession, "after_soft_rollback")
+def _discard_revocations(session: WriteTrackingSession, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop("revoked_tokens", None)
@@ -1,107 +1,682 @@
-from sqlalchemy import select
+import logging
+import re
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, Sequence
+from uuid import uuid4
+
+from sqlalchemy import Row, and_, delete, insert, inspect, or_, select, update
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached, undefer
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app.core.security import get_password_hash, verify_password
+from app.core.cache import invalidate_principals_on_commit, principal_cache
+from app.core.database import engine, use_primary
+from app.core.hashing import PasswordHashingBusy
+from app.core.metrics import (
+    password_hash_params,
+    password_rehashes,
+    timed,
+    user_service_duration,
+)
+from app.core.security import (
+    get_password_hash_async,
+    get_password_hashes_async,
+    hash_parameters,
+    verify_and_update_password_async,
+    verify_dummy_password_async,
+)
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, AdminUserCreate, AdminUserUpdate
+from app.schemas.user import (
+    AdminUserCreate,
+    AdminUserUpdate,
+    UserCreate,
+    UserFilter,
+    UserUpdate,
+)
+from app.services.stats_service import user_stats
+
+logger = logging.getLogger(__name__)
+
+# Colonnes exposées par l'API (tout sauf hashed_password)
+USER_PUBLIC_COLUMNS = (
+    User.id,
+    User.email,
+    User.username,
+    User.full_name,
+    User.is_active,
+    User.is_superuser,
+    User.created_at,
+    User.updated_at,
+)
+
+# Ligne légère (tuple nommé, hors identity map) des colonnes publiques
+UserRow = Row[tuple[str, str, str, str | None, bool, bool, datetime, datetime]]
+
+# Contrainte unique violée, par dialecte. Seule la partie du message qui nomme
+# la contrainte est lue, jamais la valeur dupliquée (fournie par l'utilisateur) :
+# - MySQL : "Duplicate entry '<valeur>' for key 'users.ix_users_email'", la clé
+#   en fin de message, d'où la dernière occurrence ;
+# - PostgreSQL : 'unique constraint "ix_users_email"', avant le DETAIL qui
+#   contient la valeur, d'où la première ;
+# - SQLite : "UNIQUE constraint failed: users.email", sans la valeur.
+_UNIQUE_CONSTRAINTS = {
+    "mysql": (re.compile(r"for key '(?:users\.)?ix_users_(email|username)'"), -1),
+    "postgresql": (re.compile(r'unique constraint "ix_users_(email|username)"'), 0),
+    "sqlite": (re.compile(r"UNIQUE constraint failed: users\.(email|username)$"), 0),
+}
+
+
+def _conflicting_field(db: AsyncSession, exc: IntegrityError) -> str:
+    """Colonne en conflit ; toute autre violation d'intégrité est relancée."""
+    pattern, position = _UNIQUE_CONSTRAINTS.get(db.get_bind().dialect.name, (None, 0))
+    matches = pattern.findall(str(exc.orig)) if pattern is not None else []
+    if not matches:
+        raise exc
+    return matches[position]
+
+
+# Message retourné au client pour chaque colonne en conflit, à la création et
+# à la modification d'un utilisateur
+CONFLICT_DETAILS = {
+    "email": "Un utilisateur avec cet email existe déjà",
+    "username": "Ce nom d'utilisateur est déjà pris",
+}
+
+UPDATE_CONFLICT_DETAILS = {
+    "email": "Cet email est déjà utilisé",
+    "username": "Ce nom d'utilisateur est déjà pris",
+}
+
+
+class UserConflictError(Exception):
+    """
+    Email ou nom d'utilisateur déjà pris (`field` vaut "email" ou "username") ;
+    `detail` est le message à retourner au client.
+    """
+
+    def __init__(self, field: str, detail: str):
+        super().__init__(detail)
+        self.field = field
+        self.detail = detail
+
+
+async def _flush_unique(db: AsyncSession, details: dict[str, str] = CONFLICT_DETAILS) -> None:
+    # Les contraintes d'unicité font la vérification (pas de SELECT préalable), et
+    # les valeurs par défaut du modèle sont calculées côté Python : le flush suffit,
+    # sans refresh pour relire id, created_at ou updated_at.
+    try:
+        await db.flush()
+    except IntegrityError as exc:
+        field = _conflicting_field(db, exc)
+        raise UserConflictError(field, details[field]) from exc
+
+# Valeurs appliquées par les actions en masse (hors suppression)
+BULK_ACTION_VALUES = {
+    "activate": {"is_active": True},
+    "deactivate": {"is_active": False},
+    "grant_superuser": {"is_superuser": True},
+    "revoke_superuser": {"is_superuser": False},
+}
+
+
+def _filter_conditions(user_filter: UserFilter) -> list:
+    conditions = []
+    if user_filter.is_active is not None:
+        conditions.append(User.is_active == user_filter.is_active)
+    if user_filter.is_superuser is not None:
+        conditions.append(User.is_superuser == user_filter.is_superuser)
+    if user_filter.created_before is not None:
+        conditions.append(User.created_at < user_filter.created_before)
+    if user_filter.created_after is not None:
+        conditions.append(User.created_at >= user_filter.created_after)
+    return conditions
+
+
+# Colonnes de tri de la recherche, toutes uniques (pagination par clé)
+SEARCH_SORT_COLUMNS = {"email": User.email, "username": User.username, "id": User.id}
+
+# Opérateurs du mode booléen de MATCH ... AGAINST, retirés de la saisie
+_FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+def _prefix_condition(column, prefix: str):
+    # Motif littéral 'abc%' construit ici : un LIKE CONCAT(:p, '%') généré par
+    # startswith() n'est pas toujours exploité comme un parcours d'index par MySQL
+    escaped = prefix.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return column.like(f"{escaped}%", escape="/")
+
+
+def _full_name_condition(query: str):
+    terms = _FULLTEXT_OPERATORS.sub(" ", query).split()
+    if engine.dialect.name == "mysql" and terms:
+        # Index FULLTEXT : chaque mot doit apparaître, en préfixe ("+jean* +dup*")
+        against = " ".join(f"+{term}*" for term in terms)
+        return match(User.full_name, against=against).in_boolean_mode()
+    return User.full_name.icontains(query, autoescape=True)
+
+
+def _chunks(items: list[str], size: int) -> Iterator[list[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _detached_snapshot(user: User) -> User:
+    """Copie détachée (sans le hash du mot de passe) réutilisable entre sessions."""
+    snapshot = User(**{
+        attr.key: getattr(user, attr.key)
+        for attr in inspect(User).column_attrs
+        if attr.key != "hashed_password"
+    })
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def _record_created(db: AsyncSession, user: User) -> None:
+    user_stats.record(
+        db, total=1, active=int(user.is_active), superusers=int(user.is_superuser),
+        created_at=user.created_at,
+    )
+
+
+def _record_changed(db: AsyncSession, user: User, was_active: bool, was_superuser: bool) -> None:
+    if user.is_active != was_active or user.is_superuser != was_superuser:
+        user_stats.record(
+            db,
+            active=int(user.is_active) - int(was_active),
+            superusers=int(user.is_superuser) - int(was_superuser),
+        )
 
 
 class UserService:
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def get_by_email(db: AsyncSession, email: str) -> User | None:
         result = await db.execute(select(User).where(User.email == email))
         return result.scalar_one_or_none()
 
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def get_by_username(db: AsyncSession, username: str) -> User | None:
         result = await db.execute(select(User).where(User.username == username))
         return result.scalar_one_or_none()
 
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def get_by_id(db: AsyncSession, user_id: str) -> User | None:
         result = await db.execute(select(User).where(User.id == user_id))
         return result.scalar_one_or_none()
+
+    @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
+    async def get_principal(db: AsyncSession, user_id: str) -> User | None:
+        """
+        Comme `get_by_id`, en passant par le cache des utilisateurs authentifiés.
+
+        L'instance retournée est attachée à `db` sans requête SQL (merge sans
+        chargement) et peut donc être modifiée comme un résultat de `get_by_id`.
+        Les entrées sont invalidées au COMMIT de `update`, `update_admin`, `delete`
+        et `bulk_action`.
+        """
+        cached = principal_cache.get(user_id)
+        if cached is not None:
+            return await db.merge(cached, load=False)
+
+        # Ce qui est mis en cache y reste tout le TTL : lu sur le primaire, pour
+        # ne pas prolonger le retard d'un réplica (compte désactivé, droits retirés)
+        use_primary(db)
+        user = await UserService.get_by_id(db, user_id)
+        if user is not None:
+            principal_cache.set(user_id, _detached_snapshot(user))
+        return user
+
+    @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
+    async def get_principals(db: AsyncSession, user_ids: set[str]) -> dict[str, User]:
+        """
+        Résout un lot d'utilisateurs : le cache d'abord, puis une seule requête
+        `IN (...)` pour les absents. Les instances retournées sont en lecture seule.
+        """
+        users: dict[str, User] = {}
+        missing = []
+        for user_id in user_ids:
+            cached = principal_cache.get(user_id)
+            if cached is None:
+                missing.append(user_id)
+            else:
+                users[user_id] = cached
+
+        if missing:
+            use_primary(db)
+            result = await db.execute(select(User).where(User.id.in_(missing)))
+            for user in result.scalars():
+                users[user.id] = user
+                principal_cache.set(user.id, _detached_snapshot(user))
+        return users
     
     @staticmethod
-    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[User]:
+    @timed(user_service_duration, span_prefix="UserService")
+    async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[UserRow]:
         result = await db.execute(
-            select(User)
-            .order_by(User.created_at.desc())
+            select(*USER_PUBLIC_COLUMNS)
+            .order_by(User.created_at.desc(), User.id.desc())
             .offset(skip)
             .limit(limit)
         )
-        return list(result.scalars().all())
+        return list(result.all())
+
+    @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
+    async def get_page(
+        db: AsyncSession,
+        limit: int = 100,
+        after: tuple[datetime, str] | None = None,
+    ) -> list[UserRow]:
+        """Page suivant la clé `after` (created_at, id), du plus récent au plus ancien."""
+        query = select(*USER_PUBLIC_COLUMNS).order_by(User.created_at.desc(), User.id.desc()).limit(limit)
+        if after is not None:
+            created_at, user_id = after
+            query = query.where(or_(
+                User.created_at < created_at,
+                and_(User.created_at == created_at, User.id < user_id),
+            ))
+        result = await db.execute(query)
+        return list(result.all())
     
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
+    async def search(
+        db: AsyncSession,
+        email: str | None = None,
+        username: str | None = None,
+        full_name: str | None = None,
+        is_active: bool | None = None,
+        is_superuser: bool | None = None,
+        sort: str = "id",
+        limit: int = 100,
+        after: str | None = None,
+    ) -> list[UserRow]:
+        """
+        Recherche par préfixe d'email ou de username, par mots du nom complet
+        et par statut, paginée par clé sur la colonne unique `sort`.
+
+        Les ids de la page sont d'abord sélectionnés dans une table dérivée :
+        pour un préfixe d'email ou de username trié sur la même colonne, cette
+        étape ne lit que l'index (`ix_users_email` / `ix_users_username`), et
+        seules les lignes de la page sont ensuite lues dans la table.
+        """
+        sort_column = SEARCH_SORT_COLUMNS[sort]
+        conditions = []
+        if email:
+            conditions.append(_prefix_condition(User.email, email))
+        if username:
+            conditions.append(_prefix_condition(User.username, username))
+        if full_name:
+            conditions.append(_full_name_condition(full_name))
+        if is_active is not None:
+            conditions.append(User.is_active == is_active)
+        if is_superuser is not None:
+            conditions.append(User.is_superuser == is_superuser)
+        if after is not None:
+            conditions.append(sort_column > after)
+
+        page = (
+            select(User.id)
+            .where(*conditions)
+            .order_by(sort_column)
+            .limit(limit)
+            .subquery()
+        )
+        result = await db.execute(
+            select(*USER_PUBLIC_COLUMNS)
+            .join(page, User.id == page.c.id)
+            .order_by(sort_column)
+        )
+        return list(result.all())
+
+    @staticmethod
+    async def stream_public(
+        db: AsyncSession, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[UserRow]]:
+        """
+        Parcourt toute la table par lots via un curseur côté serveur, en ne
+        projetant que les colonnes publiques : la mémoire reste constante.
+        """
+        result = await db.stream(
+            select(*USER_PUBLIC_COLUMNS)
+            .order_by(User.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def count_all(db: AsyncSession) -> int:
-        from sqlalchemy import func
-        result = await db.execute(select(func.count()).select_from(User))
-        return result.scalar_one()
+        """Nombre d'utilisateurs d'après les compteurs maintenus (sans COUNT(*))."""
+        await user_stats.ensure_fresh(db)
+        return user_stats.total
 
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def create(db: AsyncSession, user_in: UserCreate) -> User:
         user = User(
             email=user_in.email,
             username=user_in.username,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=await get_password_hash_async(user_in.password),
             full_name=user_in.full_name,
         )
         db.add(user)
-        await db.flush()
-        await db.refresh(user)
+        await _flush_unique(db)
+        _record_created(db, user)
         return user
     
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def create_admin(db: AsyncSession, user_in: AdminUserCreate) -> User:
         user = User(
             email=user_in.email,
             username=user_in.username,
-            hashed_password=get_password_hash(user_in.password),
+            hashed_password=await get_password_hash_async(user_in.password),
             full_name=user_in.full_name,
             is_active=user_in.is_active,
             is_superuser=user_in.is_superuser,
         )
         db.add(user)
-        await db.flush()
-        await db.refresh(user)
+        await _flush_unique(db)
+        _record_created(db, user)
         return user
 
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
+    async def create_many(
+        db: AsyncSession,
+        users_in: list[AdminUserCreate],
+        chunk_size: int = 500,
+    ) -> list[tuple[str | None, str | None]]:
+        """
+        Création en masse, par lots de `chunk_size`, chaque lot validé (COMMIT)
+        séparément.
+
+        Par lot : une requête pour détecter les emails/usernames déjà pris, le
+        hachage des mots de passe en parallèle sur le pool, sans connexion ni
+        transaction ouverte, puis un seul INSERT multi-lignes et son COMMIT.
+        Un import de plusieurs minutes ne garde ainsi ni connexion du pool ni
+        verrous sur les index uniques au-delà d'un lot.
+
+        Retourne pour chaque entrée `(id, None)` si l'utilisateur a été créé,
+        `(None, champ)` avec le champ en conflit ("email" ou "username"), ou
+        `(None, "error")` si son lot n'a pas pu être écrit : l'import s'arrête
+        alors, et les lots précédents restent enregistrés.
+        """
+        use_primary(db)
+        outcomes: list[tuple[str | None, str | None]] = []
+        seen_emails: set[str] = set()
+        seen_usernames: set[str] = set()
+
+        for start in range(0, len(users_in), chunk_size):
+            chunk = users_in[start:start + chunk_size]
+            try:
+                outcomes.extend(
+                    await UserService._import_chunk(db, chunk, seen_emails, seen_usernames)
+                )
+                await db.commit()
+            except (SQLAlchemyError, PasswordHashingBusy):
+                await db.rollback()
+                del outcomes[start:]
+                logger.exception(
+                    "Import en masse interrompu au lot %d : %d utilisateurs déjà enregistrés",
+                    start // chunk_size, sum(1 for user_id, _ in outcomes if user_id),
+                )
+                outcomes.extend((None, "error") for _ in users_in[start:])
+                break
+
+        return outcomes
+
+    @staticmethod
+    async def _import_chunk(
+        db: AsyncSession,
+        chunk: list[AdminUserCreate],
+        seen_emails: set[str],
+        seen_usernames: set[str],
+    ) -> list[tuple[str | None, str | None]]:
+        existing = await db.execute(
+            select(User.email, User.username).where(or_(
+                User.email.in_({user_in.email for user_in in chunk}),
+                User.username.in_({user_in.username for user_in in chunk}),
+            ))
+        )
+        for email, username in existing:
+            seen_emails.add(email)
+            seen_usernames.add(username)
+        # Rend la connexion avant le hachage ; un conflit apparu entre-temps est
+        # rattrapé par _insert_rows
+        await db.commit()
+
+        chunk_outcomes: list[tuple[str | None, str | None]] = []
+        accepted: list[AdminUserCreate] = []
+        for user_in in chunk:
+            if user_in.email in seen_emails:
+                chunk_outcomes.append((None, "email"))
+            elif user_in.username in seen_usernames:
+                chunk_outcomes.append((None, "username"))
+            else:
+                seen_emails.add(user_in.email)
+                seen_usernames.add(user_in.username)
+                chunk_outcomes.append((str(uuid4()), None))
+                accepted.append(user_in)
+
+        hashes = await get_password_hashes_async([user_in.password for user_in in accepted])
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "id": user_id,
+                "email": user_in.email,
+                "username": user_in.username,
+                "hashed_password": hashed_password,
+                "full_name": user_in.full_name,
+                "is_active": user_in.is_active,
+                "is_superuser": user_in.is_superuser,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (user_id, _), user_in, hashed_password in zip(
+                (outcome for outcome in chunk_outcomes if outcome[0]), accepted, hashes
+            )
+        ]
+        if rows:
+            await UserService._insert_rows(db, rows, chunk_outcomes)
+            created = {user_id for user_id, _ in chunk_outcomes if user_id}
+            for row in rows:
+                if row["id"] in created:
+                    user_stats.record(
+                        db, total=1, active=int(row["is_active"]),
+                        superusers=int(row["is_superuser"]), created_at=now,
+                    )
+        return chunk_outcomes
+
+    @staticmethod
+    async def _insert_rows(
+        db: AsyncSession,
+        rows: list[dict],
+        outcomes: list[tuple[str | None, str | None]],
+    ) -> None:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(User).values(rows))
+            return
+        except IntegrityError:
+            pass
+
+        # Conflit avec une écriture concurrente : on rejoue ligne par ligne
+        for row in rows:
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(User).values(row))
+            except IntegrityError as exc:
+                position = outcomes.index((row["id"], None))
+                outcomes[position] = (None, _conflicting_field(db, exc))
+
+    @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def update(db: AsyncSession, user: User, user_in: UserUpdate) -> User:
         update_data = user_in.model_dump(exclude_unset=True)
 
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await get_password_hash_async(
+                update_data.pop("password")
+            )
 
+        was_active, was_superuser = user.is_active, user.is_superuser
         for field, value in update_data.items():
             setattr(user, field, value)
 
-        await db.flush()
-        await db.refresh(user)
+        await _flush_unique(db, UPDATE_CONFLICT_DETAILS)
+        _record_changed(db, user, was_active, was_superuser)
+        invalidate_principals_on_commit(db, [user.id])
         return user
 
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def update_admin(db: AsyncSession, user: User, user_in: AdminUserUpdate) -> User:
         update_data = user_in.model_dump(exclude_unset=True)
         
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await get_password_hash_async(
+                update_data.pop("password")
+            )
         
+        was_active, was_superuser = user.is_active, user.is_superuser
         for field, value in update_data.items():
             setattr(user, field, value)
         
-        await db.flush()
-        await db.refresh(user)
+        await _flush_unique(db, UPDATE_CONFLICT_DETAILS)
+        _record_changed(db, user, was_active, was_superuser)
+        invalidate_principals_on_commit(db, [user.id])
         return user
 
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def delete(db: AsyncSession, user: User) -> None:
         await db.delete(user)
         await db.flush()
+        user_stats.record(
+            db, total=-1, active=-int(user.is_active), superusers=-int(user.is_superuser),
+            created_at=user.created_at,
+        )
+        invalidate_principals_on_commit(db, [user.id])
+
+    @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
+    async def bulk_action(
+        db: AsyncSession,
+        action: str,
+        ids: list[str] | None = None,
+        user_filter: UserFilter | None = None,
+        exclude_id: str | None = None,
+        chunk_size: int = 1000,
+    ) -> int:
+        """
+        Applique `action` aux utilisateurs désignés par `ids` ou par `user_filter`,
+        par lots de `chunk_size` via des `UPDATE`/`DELETE ... WHERE id IN (...)`.
+
+        Les lignes déjà dans l'état demandé ne sont pas réécrites : le nombre
+        retourné est celui des utilisateurs réellement modifiés.
+        """
+        use_primary(db)
+        values = BULK_ACTION_VALUES.get(action)
+        conditions = [] if user_filter is None else _filter_conditions(user_filter)
+        if values is not None:
+            conditions += [getattr(User, field) != value for field, value in values.items()]
+
+        affected = 0
+        async for chunk in UserService._target_chunks(db, ids, conditions, exclude_id, chunk_size):
+            if values is None:
+                statement = delete(User)
+            else:
+                statement = update(User).values(
+                    **values, updated_at=datetime.now(timezone.utc)
+                )
+            result = await db.execute(
+                statement.where(User.id.in_(chunk), *conditions)
+                .execution_options(synchronize_session=False)
+            )
+            affected += result.rowcount
+            invalidate_principals_on_commit(db, chunk)
+
+        if values is None:
+            # On ne sait pas combien d'actifs ou d'admins ont été supprimés
+            if affected:
+                user_stats.mark_stale(db)
+        else:
+            (field, value), = values.items()
+            delta = affected if value else -affected
+            user_stats.record(
+                db,
+                active=delta if field == "is_active" else 0,
+                superusers=delta if field == "is_superuser" else 0,
+            )
+        return affected
+
+    @staticmethod
+    async def _target_chunks(
+        db: AsyncSession,
+        ids: list[str] | None,
+        conditions: list,
+        exclude_id: str | None,
+        chunk_size: int,
+    ) -> AsyncIterator[list[str]]:
+        if ids is not None:
+            for chunk in _chunks(sorted(set(ids) - {exclude_id}), chunk_size):
+                yield chunk
+            return
+
+        # Filtre : parcours des ids concernés par clé, sans OFFSET
+        last_id = ""
+        while True:
+            result = await db.execute(
+                select(User.id)
+                .where(User.id > last_id, User.id != exclude_id, *conditions)
+                .order_by(User.id)
+                .limit(chunk_size)
+            )
+            chunk = list(result.scalars())
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1]
 
     @staticmethod
+    @timed(user_service_duration, span_prefix="UserService")
     async def authenticate(db: AsyncSession, email: str, password: str) -> User | None:
-        user = await UserService.get_by_email(db, email)
-        if not user or not verify_password(password, user.hashed_password):
+        # Le hash doit refléter le dernier changement de mot de passe
+        use_primary(db)
+        # Seul chemin qui lit hashed_password (colonne différée sur le modèle)
+        result = await db.execute(
+            select(User).where(User.email == email).options(undefer(User.hashed_password))
+        )
+        user = result.scalar_one_or_none()
+        if not user:
+            # Même durée de réponse qu'un mauvais mot de passe : on ne révèle
+            # pas quels emails existent
+            await verify_dummy_password_async(password)
             return None
+
+        verified, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+        if not verified:
+            return None
+
+        password_hash_params.inc(hash_parameters(user.hashed_password))
+        if new_hash is not None:
+            # Hash plus faible que les paramètres argon2 courants : mis à niveau sans
+            # toucher à updated_at (ce n'est pas une modification du profil)
+            await db.execute(
+                update(User)
+                .where(User.id == user.id)
+                .values(hashed_password=new_hash, updated_at=User.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            set_committed_value(user, "hashed_password", new_hash)
+            password_rehashes.inc()
         return user
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Débit de création d'utilisateurs : `POST /admin/users` un par un contre
+`POST /admin/users/bulk`.
+
+    python -m benchmarks.bulk_import [--users 200]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import configure_environment, login, running_app, seed_users
+
+
+def _payload(prefix: str, count: int) -> list[dict]:
+    return [
+        {"email": f"{prefix}{i}@example.com", "username": f"{prefix}{i}", "password": "password123"}
+        for i in range(count)
+    ]
+
+
+async def main(users: int) -> None:
+    async with running_app() as client:
+        emails = await seed_users(1, superuser=True)
+        tokens = await login(client, emails[0])
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        start = time.perf_counter()
+        for user in _payload("single", users):
+            response = await client.post("/api/v1/admin/users", json=user, headers=headers)
+            response.raise_for_status()
+        single = users / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = await client.post(
+            "/api/v1/admin/users/bulk", json=_payload("bulk", users), headers=headers
+        )
+        response.raise_for_status()
+        bulk = users / (time.perf_counter() - start)
+        assert response.json()["created"] == users
+
+        print(f"{'POST /admin/users':>22}: {single:8.1f} utilisateurs/s")
+        print(f"{'POST /admin/users/bulk':>22}: {bulk:8.1f} utilisateurs/s ({bulk / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    args = parser.parse_args()
+    configure_environment()
+    asyncio.run(main(args.users))
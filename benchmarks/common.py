@@ -0,0 +1,84 @@
+"""
+Outils partagés par les benchmarks : application sur SQLite, client ASGI en
+mémoire et calcul des percentiles.
+
+`configure_environment` doit être appelé avant le premier import de `app`,
+puisque la configuration est lue à l'import.
+"""
+import os
+import statistics
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+def configure_environment(**overrides: object) -> None:
+    db_path = os.path.join(tempfile.mkdtemp(prefix="auth-bench-"), "bench.db")
+    os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{db_path}")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-not-for-production")
+    os.environ.setdefault("RATE_LIMIT_PER_MINUTE", "1000000000")
+    os.environ.setdefault("RATE_LIMIT_LOGIN_PER_MINUTE", "1000000000")
+    for key, value in overrides.items():
+        os.environ[key] = str(value)
+
+
+@asynccontextmanager
+async def running_app() -> AsyncIterator[httpx.AsyncClient]:
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+async def seed_users(count: int, superuser: bool = False) -> list[str]:
+    """Insère `count` utilisateurs partageant le même hash, retourne leurs emails."""
+    from app.core.database import AsyncSessionLocal
+    from app.core.security import get_password_hash
+    from app.models.user import User
+
+    hashed = get_password_hash(BENCH_PASSWORD)
+    emails = [f"user{i}@example.com" for i in range(count)]
+    async with AsyncSessionLocal() as session:
+        session.add_all(
+            User(
+                email=email,
+                username=f"user{i}",
+                hashed_password=hashed,
+                is_superuser=superuser,
+            )
+            for i, email in enumerate(emails)
+        )
+        await session.commit()
+    return emails
+
+
+async def login(client: httpx.AsyncClient, email: str) -> dict[str, str]:
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={"username": email, "password": BENCH_PASSWORD},
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def summarize(samples: list[float], elapsed: float | None = None) -> dict[str, float]:
+    """Résumé en millisecondes (p50/p95/p99) et débit si `elapsed` est fourni."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    quantiles = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    summary = {
+        "count": len(ordered),
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+    }
+    if elapsed:
+        summary["rps"] = round(len(ordered) / elapsed, 1)
+    return summary
@@ -0,0 +1,103 @@
+"""
+GET conditionnel sur `/auth/me` et `/admin/users/{id}` : réponse complète
+(200) contre 304 avec un `If-None-Match` à jour.
+
+    python -m benchmarks.conditional_get [--requests 3000]
+
+Pour chaque cas : débit, temps CPU et octets envoyés (en-têtes + corps) par
+requête, et requêtes SQL par requête (le cache des utilisateurs authentifiés
+étant chaud, un 304 n'en fait aucune). L'application est appelée
+directement en ASGI, sans client HTTP.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import configure_environment, login, running_app, seed_users
+
+
+def _scope(path: str, headers: list[tuple[bytes, bytes]]) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), *headers],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+
+async def _drive(app, scope: dict, requests: int) -> dict[str, float]:
+    from sqlalchemy import event
+
+    from app.core.database import engine
+
+    sent = 0
+    statements = 0
+    status = None
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal sent, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            sent += sum(len(name) + len(value) + 4 for name, value in message["headers"])
+        else:
+            sent += len(message.get("body", b""))
+
+    for _ in range(200):  # échauffement (et remplissage du cache)
+        await app(dict(scope), receive, send)
+    sent = 0
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+    return {
+        "status": status,
+        "req_per_s": round(requests / wall),
+        "cpu_us_per_req": round(cpu / requests * 1_000_000),
+        "bytes_per_req": round(sent / requests),
+        "sql_per_req": round(statements / requests, 2),
+    }
+
+
+async def main(requests: int) -> None:
+    async with running_app() as client:
+        emails = await seed_users(1, superuser=True)
+        token = (await login(client, emails[0]))["access_token"]
+        authorization = (b"authorization", f"Bearer {token}".encode())
+        me = await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+        user_id, etag = me.json()["id"], me.headers["etag"]
+        app = client._transport.app
+
+        for path in ("/api/v1/auth/me", f"/api/v1/admin/users/{user_id}"):
+            label = path if "admin" not in path else "/api/v1/admin/users/{id}"
+            for variant, headers in (
+                ("200", [authorization]),
+                ("304", [authorization, (b"if-none-match", etag.encode())]),
+            ):
+                result = await _drive(app, _scope(path, headers), requests)
+                print(f"{label:>26} {variant}: {result}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    configure_environment()
+    asyncio.run(main(args.requests))
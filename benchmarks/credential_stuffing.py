@@ -0,0 +1,92 @@
+"""
+Attaque par bourrage d'identifiants sur `/auth/login` : CPU consommé avec et
+sans blocage par compte.
+
+    python -m benchmarks.credential_stuffing [--accounts 20] [--attempts 400] [--concurrency 8]
+
+Les tentatives visent au hasard des comptes existants et des emails inconnus,
+toujours avec un mauvais mot de passe. Le coût argon2 est réduit pour que le
+benchmark reste court ; le rapport entre les deux configurations ne dépend
+que du nombre de vérifications évitées. Chaque configuration tourne dans un
+processus séparé (la configuration est lue à l'import).
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from benchmarks.common import configure_environment, running_app, seed_users
+
+
+async def _scenario(accounts: int, attempts: int, concurrency: int) -> dict:
+    async with running_app() as client:
+        emails = await seed_users(accounts)
+        targets = emails + [f"unknown{i}@example.com" for i in range(accounts)]
+        rng = random.Random(0)
+        statuses: Counter[int] = Counter()
+        remaining = attempts
+
+        async def attacker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    data={"username": rng.choice(targets), "password": "wrong-password"},
+                )
+                statuses[response.status_code] += 1
+
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        await asyncio.gather(*(attacker() for _ in range(concurrency)))
+        cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+        return {
+            "cpu_s": round(cpu, 2),
+            "wall_s": round(wall, 2),
+            "cpu_ms_per_attempt": round(cpu / attempts * 1000, 2),
+            "statuses": dict(sorted(statuses.items())),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--threshold", type=int, default=5)
+    parser.add_argument("--scenario", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario is not None:
+        configure_environment(
+            LOGIN_THROTTLE_THRESHOLD=args.scenario,
+            PASSWORD_HASH_TIME_COST=1,
+            PASSWORD_HASH_MEMORY_COST=8192,
+        )
+        result = asyncio.run(_scenario(args.accounts, args.attempts, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    # Un seuil inatteignable revient à désactiver le blocage
+    for label, threshold in (("sans blocage", 10**9), ("blocage par compte", args.threshold)):
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.credential_stuffing",
+                "--scenario", str(threshold),
+                "--accounts", str(args.accounts),
+                "--attempts", str(args.attempts),
+                "--concurrency", str(args.concurrency),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{label:>20}: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Coût des métriques : observation unitaire, puis requêtes par seconde sur
+`/auth/me` avec METRICS_ENABLED=true et false.
+
+    python -m benchmarks.metrics_overhead [--iterations 200000] [--requests 3000]
+
+`/auth/me` traverse tous les middlewares, décode un JWT et passe par
+UserService (une requête SQL) : c'est le chemin chaud instrumenté le plus
+court. L'application est appelée directement en ASGI, sans client HTTP.
+Chaque configuration tourne dans un processus séparé (la configuration est
+lue à l'import).
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks.common import configure_environment, login, running_app, seed_users
+
+
+def _ns_per_call(func, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+async def _micro(iterations: int) -> dict:
+    from app.core.metrics import Counter, Histogram, Registry, timed
+
+    registry = Registry()
+    counter = registry.register(Counter("bench_total", "", ("outcome",)))
+    histogram = registry.register(Histogram("bench_seconds", "", ("method",)))
+
+    async def noop() -> None:
+        pass
+
+    wrapped = timed(histogram)(noop)
+
+    async def coroutines(func) -> float:
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            await func()
+        return (time.perf_counter_ns() - start) / iterations
+
+    return {
+        "counter_inc_ns": round(_ns_per_call(lambda: counter.inc("accepted"), iterations)),
+        "histogram_observe_ns": round(_ns_per_call(lambda: histogram.observe(0.003, "get"), iterations)),
+        "timed_overhead_ns": round(await coroutines(wrapped) - await coroutines(noop)),
+    }
+
+
+async def _scenario(requests: int) -> dict:
+    async with running_app() as client:
+        emails = await seed_users(1)
+        token = (await login(client, emails[0]))["access_token"]
+        app = client._transport.app
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/v1/auth/me",
+            "raw_path": b"/api/v1/auth/me",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            pass
+
+        async def drive(count: int) -> float:
+            start = time.perf_counter()
+            for _ in range(count):
+                await app(dict(scope), receive, send)
+            return count / (time.perf_counter() - start)
+
+        await drive(200)  # échauffement
+        return {"req_per_s": round(await drive(requests))}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--scenario", choices=("micro", "true", "false"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario == "micro":
+        configure_environment()
+        print(json.dumps(asyncio.run(_micro(args.iterations))))
+        return
+    if args.scenario is not None:
+        configure_environment(METRICS_ENABLED=args.scenario)
+        print(json.dumps(asyncio.run(_scenario(args.requests))))
+        return
+
+    scenarios = (
+        ("observation", "micro"),
+        ("métriques désactivées", "false"),
+        ("métriques activées", "true"),
+    )
+    for label, scenario in scenarios:
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.metrics_overhead",
+                "--scenario", scenario,
+                "--iterations", str(args.iterations),
+                "--requests", str(args.requests),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{label:>20}: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Requêtes par seconde sur `/health` : RateLimitMiddleware en ASGI pur contre la
+même logique derrière `BaseHTTPMiddleware` (implémentation précédente).
+
+    python -m benchmarks.middleware [--requests 20000]
+
+Les applications sont appelées directement en ASGI, sans client HTTP, pour
+ne mesurer que le coût de la pile de middlewares.
+"""
+import argparse
+import asyncio
+import math
+import time
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+from fastapi import FastAPI, status  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.core.rate_limit import RateLimitPolicy, SlidingWindowLimiter  # noqa: E402
+from app.middleware.auth_middleware import RateLimitMiddleware  # noqa: E402
+
+
+class BaseHTTPRateLimitMiddleware(BaseHTTPMiddleware):
+    """Même limiteur, dans l'enveloppe BaseHTTPMiddleware utilisée auparavant."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.limiter = SlidingWindowLimiter(RateLimitPolicy(limit=settings.RATE_LIMIT_PER_MINUTE))
+
+    async def dispatch(self, request, call_next):
+        retry_after = self.limiter.hit(request.client.host)
+        if retry_after:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Trop de requêtes. Réessayez plus tard."},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        return await call_next(request)
+
+
+def build_app(middleware: type | None) -> FastAPI:
+    app = FastAPI()
+    if middleware is not None:
+        app.add_middleware(middleware)
+
+    @app.get("/health")
+    async def health_check():
+        return {"status": "healthy", "version": settings.APP_VERSION}
+
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int) -> None:
+    variants = {
+        "sans middleware": None,
+        "BaseHTTPMiddleware": BaseHTTPRateLimitMiddleware,
+        "ASGI pur": RateLimitMiddleware,
+    }
+    for name, middleware in variants.items():
+        app = build_app(middleware)
+        await drive(app, 500)  # échauffement
+        print(f"{name:>20}: {await drive(app, requests):10.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20_000)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,78 @@
+"""
+Latence de `/auth/me` pendant une rafale de `/auth/login`, avec et sans pool de hachage.
+
+    python -m benchmarks.password_pool [--workers 4] [--logins 8] [--duration 5]
+
+Chaque configuration est exécutée dans un processus séparé (la configuration
+est lue à l'import) ; `--workers 0` correspond au hachage sur la boucle d'événements.
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from benchmarks.common import configure_environment, login, running_app, seed_users, summarize
+
+
+async def _scenario(logins: int, duration: float) -> dict:
+    async with running_app() as client:
+        emails = await seed_users(logins + 1)
+        tokens = await login(client, emails[0])
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        deadline = time.perf_counter() + duration
+        me_latencies: list[float] = []
+        login_count = 0
+
+        async def login_loop(email: str) -> None:
+            nonlocal login_count
+            while time.perf_counter() < deadline:
+                await login(client, email)
+                login_count += 1
+
+        async def me_loop() -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get("/api/v1/auth/me", headers=headers)
+                me_latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+                await asyncio.sleep(0.005)
+
+        await asyncio.gather(me_loop(), *(login_loop(email) for email in emails[1:]))
+        return {"me": summarize(me_latencies), "logins_per_s": round(login_count / duration, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--logins", type=int, default=8, help="clients /login concurrents")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--scenario", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario is not None:
+        configure_environment(PASSWORD_HASH_WORKERS=args.scenario)
+        result = asyncio.run(_scenario(args.logins, args.duration))
+        print(json.dumps(result))
+        return
+
+    for workers in (0, args.workers):
+        output = subprocess.run(
+            [
+                sys.executable, "-m", "benchmarks.password_pool",
+                "--scenario", str(workers),
+                "--logins", str(args.logins),
+                "--duration", str(args.duration),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        label = "sans pool" if workers == 0 else f"pool ({workers} workers)"
+        print(f"{label:>20}: /me {result['me']}  login/s={result['logins_per_s']}")
+
+
+if __name__ == "__main__":
+    main()
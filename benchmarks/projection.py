@@ -0,0 +1,87 @@
+"""
+Lecture d'une page d'utilisateurs : entités complètes avec le hash (ancien
+comportement), entités avec `hashed_password` différé, lignes `UserRow`.
+
+    python -m benchmarks.projection [--users 5000] [--limit 1000]
+
+Pour chaque variante : temps de la requête, octets de valeurs reçus de la base
+(somme des colonnes sélectionnées) et mémoire allouée par ligne retournée.
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.common import configure_environment, running_app, seed_users
+
+
+async def _measure(make_query, limit: int, repeat: int) -> tuple[float, float]:
+    from app.core.database import AsyncSessionLocal
+
+    best = float("inf")
+    for _ in range(repeat):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            result = await db.execute(make_query().limit(limit))
+            rows = result.all()
+            best = min(best, time.perf_counter() - start)
+
+    async with AsyncSessionLocal() as db:
+        tracemalloc.start()
+        result = await db.execute(make_query().limit(limit))
+        rows = result.all()
+        allocated, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, allocated / len(rows)
+
+
+async def _payload_bytes(columns, limit: int) -> int:
+    from sqlalchemy import select
+
+    from app.core.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(*columns).limit(limit))
+        return sum(
+            len(str(value).encode("utf-8"))
+            for row in result
+            for value in row
+            if value is not None
+        )
+
+
+async def main(users: int, limit: int, repeat: int) -> None:
+    from sqlalchemy import select
+    from sqlalchemy.orm import undefer
+
+    from app.models.user import User
+    from app.services.user_service import USER_PUBLIC_COLUMNS
+
+    async with running_app():
+        await seed_users(users)
+
+        all_columns = [attr.expression for attr in User.__mapper__.column_attrs]
+        variants = {
+            "entités + hash": (
+                lambda: select(User).options(undefer(User.hashed_password)), all_columns
+            ),
+            "entités, hash différé": (lambda: select(User), USER_PUBLIC_COLUMNS),
+            "UserRow": (lambda: select(*USER_PUBLIC_COLUMNS), USER_PUBLIC_COLUMNS),
+        }
+        for name, (make_query, columns) in variants.items():
+            elapsed, per_row = await _measure(make_query, limit, repeat)
+            payload = await _payload_bytes(columns, limit)
+            print(
+                f"{name:>22}: {elapsed * 1000:7.2f} ms | "
+                f"{payload / 1024:7.1f} KiB reçus | {per_row:6.0f} o alloués/ligne"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    configure_environment()
+    asyncio.run(main(args.users, args.limit, args.repeat))
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark du limiteur : ancienne liste d'horodatages par IP contre
+`SlidingWindowLimiter`.
+
+    python -m benchmarks.rate_limiter [--calls 60] [--requests 200000] [--ips 50000]
+
+Deux charges : un client « chaud » proche de sa limite (coût par requête) et
+un balayage d'IP distinctes (mémoire conservée).
+"""
+import argparse
+import time
+import tracemalloc
+from collections import defaultdict
+
+from app.core.rate_limit import RateLimitPolicy, SlidingWindowLimiter
+
+
+class LegacyListLimiter:
+    """Algorithme de l'ancien RateLimitMiddleware, tel quel."""
+
+    def __init__(self, calls: int, period: int = 60):
+        self.calls = calls
+        self.period = period
+        self.requests = defaultdict(list)
+
+    def hit(self, client_ip: str, now: float) -> bool:
+        self.requests[client_ip] = [
+            req_time for req_time in self.requests[client_ip]
+            if now - req_time < self.period
+        ]
+        if len(self.requests[client_ip]) >= self.calls:
+            return False
+        self.requests[client_ip].append(now)
+        return True
+
+
+def _hot_client(hit, requests: int) -> float:
+    now = 1_000_000.0
+    start = time.perf_counter()
+    for i in range(requests):
+        hit("203.0.113.7", now + i * 0.001)
+    return (time.perf_counter() - start) / requests * 1e9
+
+
+def _ip_scan(hit, ips: int) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(ips):
+        hit(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", 1_000_000.0 + i * 0.001)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / ips * 1e9, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--ips", type=int, default=50_000)
+    parser.add_argument("--max-keys", type=int, default=10_000)
+    args = parser.parse_args()
+
+    def sliding_window():
+        limiter = SlidingWindowLimiter(RateLimitPolicy(limit=args.calls), max_keys=args.max_keys)
+        return lambda key, now: limiter.hit(key, now=now) == 0
+
+    implementations = {
+        "liste par IP": lambda: LegacyListLimiter(args.calls).hit,
+        "fenêtre glissante": sliding_window,
+    }
+
+    for name, factory in implementations.items():
+        hot_ns = _hot_client(factory(), args.requests)
+        scan_ns, peak = _ip_scan(factory(), args.ips)
+        print(
+            f"{name:>18}: client chaud {hot_ns:8.0f} ns/req | "
+            f"balayage {args.ips} IP {scan_ns:6.0f} ns/req, pic mémoire {peak / 1024:8.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Sérialisation de listes d'utilisateurs : chemins de FastAPI pour un
+`response_model=list[UserResponse]` contre `dump_users_json`.
+
+    python -m benchmarks.serialization [--sizes 1 100 1000]
+
+Les utilisateurs sont des instances ORM construites en mémoire : seul le coût
+de la conversion en JSON est mesuré, pas la requête SQL.
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app.models.user import User  # noqa: E402
+from app.schemas.user import UserResponse, dump_users_json  # noqa: E402
+
+response_adapter = TypeAdapter(list[UserResponse])
+
+
+def build_users(count: int) -> list[User]:
+    now = datetime.now(timezone.utc)
+    return [
+        User(
+            id=f"00000000-0000-4000-8000-{i:012d}",
+            email=f"user{i}@example.com",
+            username=f"user{i}",
+            hashed_password="x",
+            full_name=f"Utilisateur {i}",
+            is_active=True,
+            is_superuser=False,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def validate_then_dumps(users: list[User]) -> bytes:
+    """FastAPI <= 0.12x : validation, dict Python puis json.dumps."""
+    value = response_adapter.validate_python(users, from_attributes=True)
+    return json.dumps(response_adapter.dump_python(value, mode="json")).encode("utf-8")
+
+
+def validate_then_dump_json(users: list[User]) -> bytes:
+    """FastAPI récent : validation puis sérialisation directe en JSON."""
+    value = response_adapter.validate_python(users, from_attributes=True)
+    return response_adapter.dump_json(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    variants = {
+        "validation + json.dumps": validate_then_dumps,
+        "validation + dump_json": validate_then_dump_json,
+        "dump_users_json": dump_users_json,
+    }
+    for size in args.sizes:
+        users = build_users(size)
+        reference = json.loads(validate_then_dump_json(users))
+        number = max(1, 2000 // size)
+        print(f"{size} utilisateur(s)")
+        for name, serialize in variants.items():
+            assert json.loads(serialize(users)) == reference, name
+            best = min(timeit.repeat(lambda: serialize(users), number=number, repeat=args.repeat))
+            print(f"{name:>26}: {best / number * 1e6:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
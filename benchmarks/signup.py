@@ -0,0 +1,85 @@
+"""
+Inscriptions par seconde et requêtes SQL par inscription : chemin précédent
+(SELECT d'unicité sur l'email et le username, INSERT, refresh) contre
+`UserService.create` (INSERT seul, conflits détectés par les contraintes).
+
+    python -m benchmarks.signup [--users 500] [--concurrency 10]
+
+Le coût argon2 est abaissé pour que la mesure porte sur les allers-retours
+avec la base plutôt que sur le hachage.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import configure_environment, running_app
+
+
+async def _legacy_create(db, user_in):
+    from app.services.user_service import UserService
+
+    if await UserService.get_by_email(db, user_in.email):
+        return None
+    if await UserService.get_by_username(db, user_in.username):
+        return None
+    user = await UserService.create(db, user_in)
+    await db.refresh(user)
+    return user
+
+
+async def _current_create(db, user_in):
+    from app.services.user_service import UserService
+
+    return await UserService.create(db, user_in)
+
+
+async def _run(create, prefix: str, users: int, concurrency: int) -> tuple[float, float]:
+    from sqlalchemy import event
+
+    from app.core.database import AsyncSessionLocal, engine
+    from app.schemas.user import UserCreate
+
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def signup(i: int) -> None:
+        user_in = UserCreate(
+            email=f"{prefix}{i}@example.com", username=f"{prefix}{i}", password="password123"
+        )
+        async with semaphore, AsyncSessionLocal() as db:
+            await create(db, user_in)
+            await db.commit()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(signup(i) for i in range(users)))
+    elapsed = time.perf_counter() - start
+    event.remove(engine.sync_engine, "before_cursor_execute", count)
+    return users / elapsed, statements / users
+
+
+async def main(users: int, concurrency: int) -> None:
+    from app.core.security import pwd_context
+
+    pwd_context.update(argon2__rounds=1, argon2__memory_cost=1024, argon2__parallelism=1)
+    async with running_app():
+        for label, create, prefix in (
+            ("avant (SELECT + INSERT + refresh)", _legacy_create, "legacy"),
+            ("après (INSERT seul)", _current_create, "current"),
+        ):
+            rate, per_signup = await _run(create, prefix, users, concurrency)
+            print(f"{label:>34}: {rate:8.1f} inscriptions/s, {per_signup:.1f} requêtes SQL/inscription")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    configure_environment()
+    asyncio.run(main(args.users, args.concurrency))
@@ -0,0 +1,250 @@
+"""
+Suite de charge de référence : inscription, connexion, `/auth/me`,
+rafraîchissement et listing admin, contre SQLite, dans le processus.
+
+    python -m benchmarks.suite [--users 1000] [--requests 500] [--concurrency 10]
+    python -m benchmarks.suite --save              # enregistre la référence
+    python -m benchmarks.suite --check [--threshold 0.2]
+
+Chaque charge envoie `--requests` requêtes par `--concurrency` clients via
+le transport ASGI de httpx ; le résumé (req/s, p50/p95/p99) retenu est celui
+de la répétition au débit médian. Avec `--check`, le code de sortie vaut 1
+si une charge perd plus de `--threshold` de débit ou de p95 par rapport à la
+référence (benchmarks/baselines.json), ou si une requête a échoué.
+
+Les références ne valent que pour la machine qui les a produites : elles
+sont à enregistrer sur la machine qui exécute `--check` (poste ou CI). Le
+coût argon2 est abaissé pour que login et inscription mesurent le service
+plutôt que le hachage.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    configure_environment,
+    login,
+    running_app,
+    seed_users,
+    summarize,
+)
+
+DEFAULT_BASELINE = Path(__file__).with_name("baselines.json")
+
+# Nombre de comptes connectés avant la mesure (tokens pour /me et /refresh)
+SESSIONS = 50
+
+
+class Context:
+    def __init__(self, emails: list[str], tokens: list[dict[str, str]], admin_token: str):
+        self.emails = emails
+        self.tokens = tokens
+        self.admin_token = admin_token
+        self.session_locks = [asyncio.Lock() for _ in range(SESSIONS)]
+        self.rng = random.Random(0)
+        self.run = 0
+
+
+Workload = Callable[[httpx.AsyncClient, Context, int], Awaitable[httpx.Response]]
+
+
+async def _register(client: httpx.AsyncClient, ctx: Context, i: int) -> httpx.Response:
+    return await client.post("/api/v1/auth/register", json={
+        "email": f"bench{ctx.run}-{i}@example.com",
+        "username": f"bench{ctx.run}-{i}",
+        "password": "benchmark-password",
+    })
+
+
+async def _login(client: httpx.AsyncClient, ctx: Context, i: int) -> httpx.Response:
+    return await client.post(
+        "/api/v1/auth/login",
+        data={"username": ctx.rng.choice(ctx.emails), "password": BENCH_PASSWORD},
+    )
+
+
+async def _me(client: httpx.AsyncClient, ctx: Context, i: int) -> httpx.Response:
+    token = ctx.rng.choice(ctx.tokens)["access_token"]
+    return await client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+async def _refresh(client: httpx.AsyncClient, ctx: Context, i: int) -> httpx.Response:
+    # Tokens à usage unique : chaque session garde le dernier token émis et
+    # n'est jamais rafraîchie par deux requêtes à la fois
+    session = i % len(ctx.tokens)
+    async with ctx.session_locks[session]:
+        response = await client.post(
+            "/api/v1/auth/refresh", params={"refresh_token_var": ctx.tokens[session]["refresh_token"]}
+        )
+        if response.is_success:
+            ctx.tokens[session] = response.json()
+    return response
+
+
+async def _admin_list(client: httpx.AsyncClient, ctx: Context, i: int) -> httpx.Response:
+    return await client.get(
+        "/api/v1/admin/users",
+        params={"limit": 50},
+        headers={"Authorization": f"Bearer {ctx.admin_token}"},
+    )
+
+
+WORKLOADS: dict[str, Workload] = {
+    "register": _register,
+    "login": _login,
+    "me": _me,
+    "refresh": _refresh,
+    "admin_list": _admin_list,
+}
+
+
+async def _drive(
+    client: httpx.AsyncClient, ctx: Context, workload: Workload, requests: int, concurrency: int
+) -> dict[str, float]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in remaining:
+            start = time.perf_counter()
+            response = await workload(client, ctx, i)
+            latencies.append(time.perf_counter() - start)
+            if response.is_error:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = summarize(latencies, time.perf_counter() - start)
+    summary["errors"] = errors
+    return summary
+
+
+async def _setup(users: int) -> Context:
+    from sqlalchemy import update
+
+    from app.core.database import AsyncSessionLocal
+    from app.models.user import User
+
+    emails = await seed_users(users)
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(User).where(User.email == emails[0]).values(is_superuser=True))
+        await session.commit()
+    return Context(emails, [], "")
+
+
+async def run_suite(
+    names: list[str], users: int, requests: int, concurrency: int, repeat: int
+) -> dict[str, dict[str, float]]:
+    results = {}
+    async with running_app() as client:
+        ctx = await _setup(users)
+        ctx.tokens = [await login(client, email) for email in ctx.emails[:SESSIONS]]
+        ctx.admin_token = ctx.tokens[0]["access_token"]
+        for name in names:
+            runs = []
+            for _ in range(repeat):
+                ctx.run += 1
+                runs.append(await _drive(client, ctx, WORKLOADS[name], requests, concurrency))
+            median_rps = statistics.median_low(run["rps"] for run in runs)
+            results[name] = next(run for run in runs if run["rps"] == median_rps)
+    return results
+
+
+def environment() -> dict[str, str | int | None]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(
+    baseline: dict[str, dict[str, float]], results: dict[str, dict[str, float]], threshold: float
+) -> list[str]:
+    """Charges en régression : débit ou p95 dégradé de plus de `threshold`, ou erreurs."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if result["errors"]:
+            regressions.append(f"{name}: {result['errors']} requêtes en erreur")
+        if reference is None:
+            continue
+        if result["rps"] < reference["rps"] * (1 - threshold):
+            regressions.append(f"{name}: {reference['rps']} -> {result['rps']} req/s")
+        if result["p95_ms"] > reference["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {reference['p95_ms']} -> {result['p95_ms']} ms")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="charges séparées par des virgules")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--save", action="store_true", help="enregistrer les résultats comme référence")
+    mode.add_argument("--check", action="store_true", help="échouer en cas de régression")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    names = args.workloads.split(",")
+    unknown = set(names) - WORKLOADS.keys()
+    if unknown:
+        parser.error(f"charges inconnues : {', '.join(sorted(unknown))}")
+    parameters = {"users": args.users, "requests": args.requests, "concurrency": args.concurrency}
+
+    baseline = None
+    if args.check:
+        if not args.baseline.exists():
+            parser.error(f"aucune référence dans {args.baseline} (lancer d'abord --save)")
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline["parameters"] != parameters:
+            parser.error(f"paramètres différents de la référence : {baseline['parameters']}")
+        if baseline["environment"] != environment():
+            print(f"attention : référence produite sur {baseline['environment']}", file=sys.stderr)
+
+    configure_environment(
+        PASSWORD_HASH_TIME_COST=1,
+        PASSWORD_HASH_MEMORY_COST=8192,
+        PASSWORD_HASH_PARALLELISM=1,
+    )
+    results = asyncio.run(
+        run_suite(names, args.users, args.requests, args.concurrency, args.repeat)
+    )
+    for name, result in results.items():
+        reference = baseline["workloads"].get(name) if baseline else None
+        delta = f"  ({(result['rps'] / reference['rps'] - 1) * 100:+.1f} % req/s)" if reference else ""
+        print(f"{name:>12}: {result}{delta}")
+
+    if args.save:
+        args.baseline.write_text(json.dumps({
+            "environment": environment(),
+            "parameters": parameters,
+            "workloads": results,
+        }, indent=2) + "\n", encoding="utf-8")
+        print(f"référence enregistrée dans {args.baseline}")
+    elif baseline is not None:
+        regressions = compare(baseline["workloads"], results, args.threshold)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+# Avant tout import de `app` : les réglages sont lus à l'import
+_db_dir = tempfile.mkdtemp(prefix="auth-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_dir}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key-" + "x" * 32)
+
+import pytest  # noqa: E402
+
+from app.core.cache import principal_cache  # noqa: E402
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.core.token_denylist import token_denylist  # noqa: E402
+from app.main import app  # noqa: E402, F401  (enregistre tous les modèles)
+
+
+@pytest.fixture(autouse=True)
+def _reset_memory_state():
+    token_denylist.clear()
+    principal_cache.clear()
+    yield
+    token_denylist.clear()
+    principal_cache.clear()
+
+
+@pytest.fixture
+async def db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    try:
+        async with AsyncSessionLocal() as session:
+            yield session
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        # Les connexions aiosqlite appartiennent à la boucle du test
+        await engine.dispose()
@@ -0,0 +1,23 @@
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.user import BulkUserAction
+
+
+@pytest.mark.parametrize("user_filter", [{}, {"is_active": None, "created_before": None}])
+def test_filter_without_criteria_is_rejected(user_filter):
+    with pytest.raises(ValidationError, match="au moins un critère"):
+        BulkUserAction.model_validate({"action": "delete", "filter": user_filter})
+
+
+def test_filter_with_a_criterion_is_accepted():
+    action = BulkUserAction.model_validate({"action": "deactivate", "filter": {"is_superuser": False}})
+
+    assert action.filter.is_superuser is False
+
+
+def test_exactly_one_target_is_required():
+    with pytest.raises(ValidationError, match="soit ids, soit filter"):
+        BulkUserAction.model_validate({"action": "delete"})
+    with pytest.raises(ValidationError, match="soit ids, soit filter"):
+        BulkUserAction.model_validate({"action": "delete", "ids": ["a"], "filter": {"is_active": True}})
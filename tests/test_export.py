@@ -0,0 +1,17 @@
+import csv
+import io
+
+from app.api.v1.endpoints.admin import _csv_lines, _csv_value
+
+
+def test_csv_cells_cannot_start_a_formula():
+    values = ["=HYPERLINK(\"http://evil\")", "+1", "-1", "@SUM(A1)", "\tx", "\rx"]
+
+    assert [_csv_value(value) for value in values] == ["'" + value for value in values]
+
+
+def test_csv_values_are_written_like_the_api():
+    row = [_csv_value(value) for value in ("alice", None, True, False, "2026-01-01T00:00:00Z")]
+    line = _csv_lines([row]).decode("utf-8")
+
+    assert next(csv.reader(io.StringIO(line))) == ["alice", "", "true", "false", "2026-01-01T00:00:00Z"]
@@ -0,0 +1,63 @@
+import base64
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.core.security import get_password_hash
+from app.main import app
+from app.models.user import User
+from app.services.token_service import TokenService
+
+INTROSPECT = "/api/v1/auth/introspect"
+CLIENT_AUTH = {"Authorization": "Basic " + base64.b64encode(b"gateway:secret").decode("ascii")}
+
+
+@pytest.fixture
+async def client(db, monkeypatch):
+    monkeypatch.setattr(settings, "INTROSPECTION_CLIENTS", {"gateway": "secret"})
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def _user_tokens(db):
+    user = User(email="a@example.com", username="alice", hashed_password=get_password_hash("password123"))
+    db.add(user)
+    await db.commit()
+    return TokenService.issue(user.id)
+
+
+async def test_requires_client_authentication(client):
+    response = await client.post(INTROSPECT, json={"tokens": ["x"]})
+
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == 'Basic realm="introspection"'
+
+
+async def test_only_access_tokens_are_active(client, db):
+    tokens = await _user_tokens(db)
+
+    response = await client.post(
+        INTROSPECT,
+        json={"tokens": [tokens.access_token, tokens.refresh_token, "not-a-token"]},
+        headers=CLIENT_AUTH,
+    )
+
+    assert response.status_code == 200
+    access, refresh, invalid = response.json()
+    assert access["active"] and access["type"] == "access" and access["username"] == "alice"
+    assert refresh == {"active": False}
+    assert invalid == {"active": False}
+
+
+async def test_revoked_session_is_inactive(client, db):
+    tokens = await _user_tokens(db)
+    logout = await client.post(
+        "/api/v1/auth/logout", headers={"Authorization": f"Bearer {tokens.access_token}"}
+    )
+    assert logout.is_success
+
+    response = await client.post(INTROSPECT, json={"tokens": [tokens.access_token]}, headers=CLIENT_AUTH)
+
+    assert response.json() == [{"active": False}]
@@ -0,0 +1,49 @@
+from app.core.login_throttle import LoginThrottle
+
+
+def _throttle(**kwargs) -> LoginThrottle:
+    options = {"threshold": 3, "base_delay": 1.0, "max_delay": 8.0, "reset_after": 100.0}
+    return LoginThrottle(secret="secret", **{**options, **kwargs})
+
+
+def test_locks_after_threshold_with_exponential_delay():
+    throttle = _throttle()
+
+    assert throttle.record_failure("a@example.com", now=0.0) == 0.0
+    assert throttle.record_failure("a@example.com", now=1.0) == 0.0
+    assert throttle.retry_after("a@example.com", now=1.0) == 0.0
+    assert throttle.record_failure("a@example.com", now=2.0) == 1.0
+    assert throttle.record_failure("a@example.com", now=3.0) == 2.0
+    assert throttle.record_failure("a@example.com", now=5.0) == 4.0
+    assert throttle.record_failure("a@example.com", now=9.0) == 8.0
+    assert throttle.record_failure("a@example.com", now=17.0) == 8.0
+
+
+def test_unlocks_when_delay_elapses():
+    throttle = _throttle()
+    for now in (0.0, 1.0, 2.0, 3.0):
+        throttle.record_failure("a@example.com", now=now)
+
+    assert throttle.retry_after("a@example.com", now=3.5) == 1.5
+    assert throttle.retry_after("a@example.com", now=5.0) == 0.0
+
+
+def test_counter_resets_after_quiet_period_or_success():
+    throttle = _throttle()
+    for now in (0.0, 1.0):
+        throttle.record_failure("a@example.com", now=now)
+    assert throttle.record_failure("a@example.com", now=102.0) == 0.0
+
+    for now in (103.0, 104.0):
+        throttle.record_failure("a@example.com", now=now)
+    throttle.record_success("a@example.com")
+    assert throttle.record_failure("a@example.com", now=105.0) == 0.0
+
+
+def test_email_is_normalized_and_unknown_accounts_are_locked_too():
+    throttle = _throttle()
+    for now in (0.0, 1.0, 2.0):
+        throttle.record_failure(" Nobody@Example.com", now=now)
+
+    assert throttle.retry_after("nobody@example.com", now=2.0) == 1.0
+    assert throttle.retry_after("someone@example.com", now=2.0) == 0.0
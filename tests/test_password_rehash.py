@@ -0,0 +1,35 @@
+import pytest
+from passlib.hash import argon2
+
+from app.core import security
+from app.core.security import needs_rehash, verify_and_update_password
+
+
+@pytest.fixture(autouse=True)
+def _cheap_argon2(monkeypatch):
+    monkeypatch.setattr(security, "_argon2_cost", (2, 16384))
+
+
+def _hash(time_cost: int, memory_cost: int, parallelism: int = 1) -> str:
+    return argon2.using(rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism).hash("password123")
+
+
+def test_weaker_hashes_are_rehashed():
+    assert needs_rehash(_hash(1, 16384))
+    assert needs_rehash(_hash(2, 8192))
+    assert needs_rehash("$2b$12$" + "a" * 53)
+
+
+def test_stronger_or_equal_hashes_are_kept():
+    # Un autre jeu de paramètres n'est pas une raison de réécrire le hash
+    assert not needs_rehash(_hash(2, 16384, parallelism=2))
+    assert not needs_rehash(_hash(3, 16384))
+    assert not needs_rehash(_hash(2, 32768))
+
+
+def test_verify_returns_new_hash_only_when_weaker():
+    assert verify_and_update_password("password123", _hash(3, 16384)) == (True, None)
+    assert verify_and_update_password("wrong-password", _hash(1, 8192)) == (False, None)
+
+    verified, new_hash = verify_and_update_password("password123", _hash(1, 8192))
+    assert verified and not needs_rehash(new_hash)
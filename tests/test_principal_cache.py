@@ -0,0 +1,38 @@
+from app.core.cache import principal_cache
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService
+
+
+async def _cached_user(db) -> User:
+    user = User(email="a@example.com", username="alice", hashed_password=get_password_hash("password123"))
+    db.add(user)
+    await db.commit()
+    await UserService.get_principal(db, user.id)
+    assert principal_cache.get(user.id) is not None
+    return user
+
+
+async def test_update_invalidates_cache_on_commit(db):
+    user = await _cached_user(db)
+
+    await UserService.update(db, user, UserUpdate(full_name="Alice"))
+    # Avant le COMMIT, une autre requête relirait l'ancienne ligne : rien à invalider
+    assert principal_cache.get(user.id) is not None
+    await db.commit()
+
+    assert principal_cache.get(user.id) is None
+    cached = await UserService.get_principal(db, user.id)
+    assert cached.full_name == "Alice"
+
+
+async def test_rollback_keeps_cache_entry(db):
+    user = await _cached_user(db)
+    user_id = user.id
+
+    await UserService.update(db, user, UserUpdate(full_name="Alice"))
+    await db.rollback()
+    await db.commit()
+
+    assert principal_cache.get(user_id) is not None
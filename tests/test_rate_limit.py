@@ -0,0 +1,35 @@
+from app.core.rate_limit import RateLimitPolicy, SlidingWindowLimiter
+
+
+def test_rejects_beyond_limit_until_window_ends():
+    limiter = SlidingWindowLimiter(RateLimitPolicy(limit=3, period=60))
+
+    assert [limiter.hit("ip", now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit("ip", now=10.0) == 50.0
+    assert limiter.hit("other", now=10.0) == 0.0
+
+
+def test_previous_window_is_weighted_by_overlap():
+    limiter = SlidingWindowLimiter(RateLimitPolicy(limit=4, period=60))
+    for _ in range(4):
+        limiter.hit("ip", now=30.0)
+
+    # À mi-fenêtre suivante, la précédente compte pour moitié : 2 places
+    assert limiter.hit("ip", now=90.0) == 0.0
+    assert limiter.hit("ip", now=90.0) == 0.0
+    assert limiter.hit("ip", now=90.0) > 0.0
+    # Deux fenêtres plus tard, plus rien n'est compté
+    assert limiter.hit("ip", now=180.0) == 0.0
+
+
+def test_evicts_least_recently_used_keys():
+    limiter = SlidingWindowLimiter(RateLimitPolicy(limit=1, period=60), max_keys=2)
+    limiter.hit("a", now=0.0)
+    limiter.hit("b", now=0.0)
+    limiter.hit("a", now=1.0)  # rejetée, mais "a" redevient la plus récente
+    limiter.hit("c", now=2.0)
+
+    assert len(limiter) == 2
+    assert limiter.hit("a", now=3.0) > 0.0
+    # "b" a été évincée : son budget repart de zéro
+    assert limiter.hit("b", now=3.0) == 0.0
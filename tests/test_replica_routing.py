@@ -0,0 +1,85 @@
+import pytest
+from passlib.hash import argon2
+from sqlalchemy import select
+
+from app.core import database
+from app.core.database import Base, ReplicaSet, use_primary
+from app.models.user import User
+from app.services.user_service import UserService
+
+PASSWORD_HASH = argon2.using(rounds=1, memory_cost=8192, parallelism=1).hash("password123")
+
+
+def _user(email: str) -> User:
+    return User(email=email, username=email.split("@")[0], hashed_password=PASSWORD_HASH)
+
+
+@pytest.fixture
+async def replica(db, tmp_path, monkeypatch):
+    """Deuxième base SQLite servant de réplica ; son contenu diffère du primaire."""
+    replicas = ReplicaSet([f"sqlite+aiosqlite:///{tmp_path}/replica.db"])
+    replica_engine = replicas.engines[0]
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(User.__table__.insert(), [
+            {"id": "replica-user", "email": "replica@example.com", "username": "replica",
+             "hashed_password": PASSWORD_HASH},
+        ])
+    monkeypatch.setattr(database, "replicas", replicas)
+    try:
+        yield replicas
+    finally:
+        await replicas.dispose()
+
+
+async def _add_to_primary(user: User) -> None:
+    async with database.AsyncSessionLocal() as session:
+        session.add(user)
+        await session.commit()
+
+
+async def _emails(db) -> set[str]:
+    return set((await db.execute(select(User.email))).scalars())
+
+
+async def test_reads_go_to_replica_until_the_session_writes(db, replica):
+    assert await _emails(db) == {"replica@example.com"}
+
+    db.add(_user("primary@example.com"))
+    await db.flush()
+    # La session relit ses propres écritures sur le primaire
+    assert await _emails(db) == {"primary@example.com"}
+
+
+async def test_use_primary_pins_reads_to_primary(db, replica):
+    await _add_to_primary(_user("primary@example.com"))
+
+    assert await _emails(db) == {"replica@example.com"}
+    use_primary(db)
+    assert await _emails(db) == {"primary@example.com"}
+
+
+async def test_principal_and_authentication_read_from_primary(db, replica):
+    user = _user("primary@example.com")
+    await _add_to_primary(user)
+
+    principal = await UserService.get_principal(db, user.id)
+    assert principal is not None and principal.email == "primary@example.com"
+
+    async with database.AsyncSessionLocal() as session:
+        assert await UserService.authenticate(session, "primary@example.com", "password123") is not None
+    async with database.AsyncSessionLocal() as session:
+        assert await UserService.authenticate(session, "replica@example.com", "password123") is None
+
+
+async def test_unreachable_replica_falls_back_to_primary(db, tmp_path, monkeypatch):
+    replicas = ReplicaSet([f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db"])
+    monkeypatch.setattr(database, "replicas", replicas)
+    await _add_to_primary(_user("primary@example.com"))
+
+    await replicas.check_health()
+
+    assert replicas.healthy == [False]
+    assert replicas.pick() is None
+    assert await _emails(db) == {"primary@example.com"}
+    await replicas.dispose()
@@ -0,0 +1,36 @@
+from app.core.token_denylist import TokenDenylist
+
+JTI = "0" * 32
+FAMILY = "f" * 32
+
+
+def test_is_revoked_by_token_or_family():
+    denylist = TokenDenylist(bucket_seconds=10)
+    denylist.add(FAMILY, expires_at=100.0)
+
+    assert denylist.is_revoked({"jti": JTI, "fam": FAMILY})
+    assert not denylist.is_revoked({"jti": JTI, "fam": "e" * 32})
+    assert FAMILY in denylist and JTI not in denylist
+
+
+def test_purge_drops_whole_expired_buckets_only():
+    denylist = TokenDenylist(bucket_seconds=10)
+    denylist.add(JTI, expires_at=105.0)
+    denylist.add(FAMILY, expires_at=125.0)
+
+    # L'entrée reste jusqu'à la fin de la tranche de son expiration
+    assert denylist.purge(now=109.0) == 0
+    assert denylist.purge(now=110.0) == 1
+    assert JTI not in denylist and FAMILY in denylist
+    assert denylist.purge(now=130.0) == 1
+    assert len(denylist) == 0
+
+
+def test_later_expiry_moves_entry_to_later_bucket():
+    denylist = TokenDenylist(bucket_seconds=10)
+    denylist.add(FAMILY, expires_at=105.0)
+    denylist.add(FAMILY, expires_at=125.0)
+    denylist.add(FAMILY, expires_at=95.0)
+
+    assert denylist.purge(now=110.0) == 0
+    assert denylist.purge(now=130.0) == 1
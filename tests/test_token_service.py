@@ -0,0 +1,48 @@
+from app.core.security import decode_token
+from app.core.token_denylist import token_denylist
+from app.services.token_service import TokenService
+
+
+async def test_reused_refresh_token_revokes_its_family(db):
+    tokens = TokenService.issue("user-1")
+    payload = decode_token(tokens.refresh_token)
+    access = decode_token(tokens.access_token)
+
+    assert await TokenService.rotate(db, payload)
+    await db.commit()
+    assert not token_denylist.is_revoked(access)
+
+    assert not await TokenService.rotate(db, payload)
+    # Toute la session est révoquée, y compris le token d'accès encore valide
+    assert token_denylist.is_revoked(access)
+    replacement = decode_token(TokenService.issue("user-1", family=payload["fam"]).refresh_token)
+    assert not await TokenService.rotate(db, replacement)
+
+
+async def test_revocation_is_applied_on_commit_only(db):
+    payload = decode_token(TokenService.issue("user-1").access_token)
+
+    await TokenService.revoke(db, payload)
+    assert not token_denylist.is_revoked(payload)
+    await db.rollback()
+    await db.commit()
+    assert not token_denylist.is_revoked(payload)
+
+    await TokenService.revoke(db, payload)
+    await db.commit()
+    assert token_denylist.is_revoked(payload)
+
+
+async def test_sync_denylist_loads_revocations_from_other_processes(db):
+    revoked = decode_token(TokenService.issue("user-1").access_token)
+    rotated = decode_token(TokenService.issue("user-2").refresh_token)
+    await TokenService.revoke(db, revoked)
+    await TokenService.rotate(db, rotated)
+    await db.commit()
+
+    # Processus qui n'a pas vu ces COMMIT
+    token_denylist.clear()
+    assert await TokenService.sync_denylist(db) == 1
+    assert token_denylist.is_revoked(revoked)
+    # Les tokens seulement échangés restent en base, pas dans la liste
+    assert not token_denylist.is_revoked(rotated)
@@ -0,0 +1,37 @@
+import pytest
+
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.user_service import UserConflictError, UserService
+
+
+async def _add_user(db, email: str, username: str) -> User:
+    user = User(email=email, username=username, hashed_password=get_password_hash("password123"))
+    db.add(user)
+    await db.commit()
+    return user
+
+
+async def test_create_reports_the_violated_constraint(db):
+    await _add_user(db, "a@example.com", "alice")
+
+    with pytest.raises(UserConflictError) as exc_info:
+        await UserService.create(db, UserCreate(email="a@example.com", username="other", password="password123"))
+    assert exc_info.value.field == "email"
+    assert exc_info.value.detail == "Un utilisateur avec cet email existe déjà"
+    await db.rollback()
+
+    # Un nom d'utilisateur qui ressemble à une clé d'index ne trompe pas l'analyse
+    with pytest.raises(UserConflictError) as exc_info:
+        await UserService.create(db, UserCreate(email="ix_users_email@example.com", username="alice", password="password123"))
+    assert exc_info.value.field == "username"
+
+
+async def test_update_uses_update_messages(db):
+    await _add_user(db, "a@example.com", "alice")
+    bob = await _add_user(db, "b@example.com", "bob")
+
+    with pytest.raises(UserConflictError) as exc_info:
+        await UserService.update(db, bob, UserUpdate(email="a@example.com"))
+    assert exc_info.value.detail == "Cet email est déjà utilisé"